@@ -0,0 +1,140 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "./interfaces/IBaseGauge.sol";
+import "./interfaces/IDYfi.sol";
+import "./interfaces/IRegistry.sol";
+
+/** @title dYFI emission distributor
+    @notice Splits each dYFI emission between gauges according to their weights.
+    @dev
+     A round is funded once, by minting if the distributor owns dYFI or by pulling
+     from the owner otherwise. `distribute` then queues the rewards of the next
+     gauges of the round, so a large gauge set can be processed in several
+     transactions. The cursor only moves forward, so a gauge is funded at most once
+     per round.
+ */
+
+contract EmissionDistributor is Ownable {
+    using SafeERC20 for IERC20;
+
+    address public immutable DYFI;
+    address public immutable REGISTRY;
+
+    address[] public gauges;
+    mapping(address => uint256) public weights;
+    uint256 public totalWeight;
+
+    //// @notice dYFI to distribute in the current round.
+    uint256 public roundAmount;
+    //// @notice dYFI already sent to gauges in the current round.
+    uint256 public roundDistributed;
+    //// @notice index of the next gauge to fund in the current round.
+    uint256 public cursor;
+
+    event WeightsUpdated(address[] gauges, uint256[] weights);
+    event RoundStarted(uint256 amount);
+    event RewardsDistributed(address indexed gauge, uint256 amount);
+
+    constructor(address _dYfi, address _registry) {
+        require(_dYfi != address(0x0), "_dYfi 0x0 address");
+        require(_registry != address(0x0), "_registry 0x0 address");
+        DYFI = _dYfi;
+        REGISTRY = _registry;
+    }
+
+    /**
+    @notice Replace the gauges and their weights.
+    @dev Can't be called while a round is in progress.
+    @param _gauges registered gauges
+    @param _weights weight of each gauge
+    */
+    function setWeights(
+        address[] calldata _gauges,
+        uint256[] calldata _weights
+    ) external onlyOwner {
+        require(!roundInProgress(), "round in progress");
+        require(_gauges.length == _weights.length, "length mismatch");
+        for (uint256 i = 0; i < gauges.length; ++i) {
+            weights[gauges[i]] = 0;
+        }
+        uint256 total = 0;
+        for (uint256 i = 0; i < _gauges.length; ++i) {
+            require(IRegistry(REGISTRY).isGauge(_gauges[i]), "!gauge");
+            require(weights[_gauges[i]] == 0, "duplicate gauge");
+            require(_weights[i] != 0, "zero weight");
+            weights[_gauges[i]] = _weights[i];
+            total += _weights[i];
+        }
+        gauges = _gauges;
+        totalWeight = total;
+        cursor = _gauges.length;
+        emit WeightsUpdated(_gauges, _weights);
+    }
+
+    /**
+    @notice Fund a new round with `_amount` dYFI.
+    @dev dYFI is minted if the distributor owns it, pulled from the owner otherwise.
+    @param _amount dYFI to distribute
+    */
+    function startRound(uint256 _amount) external onlyOwner {
+        require(!roundInProgress(), "round in progress");
+        require(gauges.length != 0, "no gauge");
+        require(_amount != 0, "==0");
+        if (IDYfi(DYFI).owner() == address(this)) {
+            IDYfi(DYFI).mint(address(this), _amount);
+        } else {
+            IERC20(DYFI).safeTransferFrom(msg.sender, address(this), _amount);
+        }
+        roundAmount = _amount;
+        roundDistributed = 0;
+        cursor = 0;
+        emit RoundStarted(_amount);
+    }
+
+    /**
+    @notice Queue the rewards of the next `_count` gauges of the round.
+    @dev The last gauge of the round also gets the rounding dust.
+    @param _count maximum number of gauges to fund
+    @return number of gauges funded
+    */
+    function distribute(uint256 _count) external returns (uint256) {
+        uint256 start = cursor;
+        uint256 end = gauges.length;
+        if (_count < end - start) {
+            end = start + _count;
+        }
+        uint256 amount = roundAmount;
+        uint256 total = totalWeight;
+        uint256 distributed = roundDistributed;
+        for (uint256 i = start; i < end; ++i) {
+            address gauge = gauges[i];
+            uint256 reward = i == gauges.length - 1
+                ? amount - distributed
+                : (amount * weights[gauge]) / total;
+            if (reward != 0) {
+                distributed += reward;
+                IERC20(DYFI).safeApprove(gauge, reward);
+                IBaseGauge(gauge).queueNewRewards(reward);
+                emit RewardsDistributed(gauge, reward);
+            }
+        }
+        roundDistributed = distributed;
+        cursor = end;
+        return end - start;
+    }
+
+    /**
+    @return true if some gauges of the current round are not funded yet.
+    */
+    function roundInProgress() public view returns (bool) {
+        return cursor < gauges.length;
+    }
+
+    function gaugeCount() external view returns (uint256) {
+        return gauges.length;
+    }
+}
@@ -33,6 +33,8 @@ contract Gauge is BaseGauge, ERC20Upgradeable, IGauge {
 
     uint256 public constant BOOSTING_FACTOR = 1;
     uint256 public constant BOOST_DENOMINATOR = 10;
+    //// @notice upper bound of the penalty flush interval.
+    uint256 public constant MAX_PENALTY_FLUSH_INTERVAL = 7 days;
 
     IERC20 public asset;
     //// @notice veYFI
@@ -45,9 +47,18 @@ contract Gauge is BaseGauge, ERC20Upgradeable, IGauge {
 
     mapping(address => uint256) private _boostedBalances;
     mapping(address => address) public recipients;
+    //// @notice penalties accrued since the last transfer to the veYFI dYFI pool.
+    uint256 public pendingPenalty;
+    //// @notice last time penalties were transferred to the veYFI dYFI pool.
+    uint256 public lastPenaltyFlush;
+    //// @notice minimum time between two automatic penalty transfers to the veYFI dYFI pool, 0 transfers every penalty right away.
+    uint256 public penaltyFlushInterval;
 
     event TransferredPenalty(address indexed account, uint256 transfered);
+    event PenaltyAccrued(address indexed account, uint256 amount);
     event BoostedBalanceUpdated(address account, uint256 amount);
+    event PenaltyFlushed(uint256 amount);
+    event PenaltyFlushIntervalUpdated(uint256 interval);
 
     event Initialize(address indexed asset, address indexed owner);
 
@@ -157,8 +168,10 @@ contract Gauge is BaseGauge, ERC20Upgradeable, IGauge {
 
                 rewards[_account] += newEarning;
                 uint256 penalty = maxEarning - newEarning;
-                _transferVeYfiORewards(penalty);
-                emit TransferredPenalty(_account, penalty);
+                if (penalty != 0) {
+                    emit PenaltyAccrued(_account, penalty);
+                    _accruePenalty(_account, penalty);
+                }
             }
             userRewardPerTokenPaid[_account] = rewardPerTokenStored;
             emit UpdatedRewards(
@@ -189,12 +202,21 @@ contract Gauge is BaseGauge, ERC20Upgradeable, IGauge {
         address _to,
         uint256
     ) internal override {
+        uint256 veTotalSupply = IVotingYFI(VEYFI).totalSupply();
         if (_from != address(0)) {
-            _boostedBalances[_from] = _boostedBalanceOf(_from);
+            _boostedBalances[_from] = _boostedBalanceOf(
+                _from,
+                balanceOf(_from),
+                veTotalSupply
+            );
             emit BoostedBalanceUpdated(_from, _boostedBalances[_from]);
         }
         if (_to != address(0)) {
-            _boostedBalances[_to] = _boostedBalanceOf(_to);
+            _boostedBalances[_to] = _boostedBalanceOf(
+                _to,
+                balanceOf(_to),
+                veTotalSupply
+            );
             emit BoostedBalanceUpdated(_to, _boostedBalances[_to]);
         }
     }
@@ -292,15 +314,40 @@ contract Gauge is BaseGauge, ERC20Upgradeable, IGauge {
         address _account,
         uint256 _realBalance
     ) internal view returns (uint256) {
-        uint256 veTotalSupply = IVotingYFI(VEYFI).totalSupply();
-        if (veTotalSupply == 0) {
+        return
+            _boostedBalanceOf(
+                _account,
+                _realBalance,
+                IVotingYFI(VEYFI).totalSupply()
+            );
+    }
+
+    /** @notice
+     *   Calculates the boosted balance of an account with a veYFI total supply
+     *   read by the caller.
+     *  @dev
+     *   Lets callers updating several accounts in one call read the veYFI
+     *   total supply only once.
+     *  @param _account The account whose veYFI lock should be checked.
+     *  @param _realBalance The amount of token _account has locked in the gauge.
+     *  @param _veTotalSupply The current veYFI total supply.
+     *  @return
+     *   The account's boosted balance. Always lower than or equal to the
+     *   account's real balance.
+     */
+    function _boostedBalanceOf(
+        address _account,
+        uint256 _realBalance,
+        uint256 _veTotalSupply
+    ) internal view returns (uint256) {
+        if (_veTotalSupply == 0) {
             return _realBalance;
         }
         return
             Math.min(
                 ((_realBalance * BOOSTING_FACTOR) +
                     (((totalSupply() * IVotingYFI(VEYFI).balanceOf(_account)) /
-                        veTotalSupply) *
+                        _veTotalSupply) *
                         (BOOST_DENOMINATOR - BOOSTING_FACTOR))) /
                     BOOST_DENOMINATOR,
                 _realBalance
@@ -531,6 +578,53 @@ contract Gauge is BaseGauge, ERC20Upgradeable, IGauge {
         }
     }
 
+    /** @notice Adds a penalty to the pending penalties.
+     *  @dev
+     *   Pending penalties are transferred to the veYFI dYFI pool at most once
+     *   every penaltyFlushInterval, or earlier through flushPenalties().
+     *   A transfer is attributed to the account whose update triggered it.
+     */
+    function _accruePenalty(address _account, uint256 _penalty) internal {
+        uint256 pending = pendingPenalty + _penalty;
+        if (block.timestamp >= lastPenaltyFlush + penaltyFlushInterval) {
+            _flushPenalties(_account, pending);
+        } else {
+            pendingPenalty = pending;
+        }
+    }
+
+    /**
+    @notice Set the minimum time between two automatic penalty transfers to the veYFI dYFI pool.
+    @dev Batching saves the approve and burn of most updates, while the pool only sees the penalties once they are flushed.
+    @param _interval interval in seconds, 0 transfers every penalty right away
+    */
+    function setPenaltyFlushInterval(uint256 _interval) external onlyOwner {
+        require(_interval <= MAX_PENALTY_FLUSH_INTERVAL, "interval too long");
+        penaltyFlushInterval = _interval;
+        emit PenaltyFlushIntervalUpdated(_interval);
+    }
+
+    /**
+    @notice Transfer the pending penalties to the veYFI dYFI pool
+    @dev The TransferredPenalty event of this transfer has the zero address as account.
+    @return amount of penalties transferred
+    */
+    function flushPenalties() external returns (uint256) {
+        uint256 pending = pendingPenalty;
+        if (pending != 0) {
+            _flushPenalties(address(0), pending);
+        }
+        return pending;
+    }
+
+    function _flushPenalties(address _account, uint256 _amount) internal {
+        pendingPenalty = 0;
+        lastPenaltyFlush = block.timestamp;
+        _transferVeYfiORewards(_amount);
+        emit TransferredPenalty(_account, _amount);
+        emit PenaltyFlushed(_amount);
+    }
+
     function _transferVeYfiORewards(uint256 _penalty) internal {
         IERC20(REWARD_TOKEN).approve(VE_YFI_POOL, _penalty);
         IDYfiRewardPool(VE_YFI_POOL).burn(_penalty);
@@ -547,14 +641,22 @@ contract Gauge is BaseGauge, ERC20Upgradeable, IGauge {
     @param _accounts Addresses to kick
     */
     function kick(address[] calldata _accounts) public {
+        uint256 veTotalSupply = IVotingYFI(VEYFI).totalSupply();
         for (uint256 i = 0; i < _accounts.length; ++i) {
-            _kick(_accounts[i]);
+            _kick(_accounts[i], veTotalSupply);
         }
     }
 
-    function _kick(address _account) internal updateReward(_account) {
+    function _kick(
+        address _account,
+        uint256 _veTotalSupply
+    ) internal updateReward(_account) {
         uint256 balance = balanceOf(_account);
-        uint256 boostedBalance = _boostedBalanceOf(_account, balance);
+        uint256 boostedBalance = _boostedBalanceOf(
+            _account,
+            balance,
+            _veTotalSupply
+        );
         _boostedBalances[_account] = boostedBalance;
         emit BoostedBalanceUpdated(_account, boostedBalance);
     }
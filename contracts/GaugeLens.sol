@@ -0,0 +1,117 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.15;
+
+import "./interfaces/IRegistry.sol";
+import "./interfaces/IGaugeViews.sol";
+
+/** @title Gauge lens
+    @notice Read-only aggregation of the gauges of a registry, so the stats of
+    every gauge, or every position of an account, can be loaded in one call.
+    @dev All methods are paginated over `Registry.getVaults()`.
+ */
+
+contract GaugeLens {
+    struct GaugeStats {
+        address vault;
+        address gauge;
+        uint256 totalAssets;
+        uint256 rewardRate;
+        uint256 periodFinish;
+        uint256 queuedRewards;
+        uint256 rewardPerToken;
+    }
+
+    struct Position {
+        address vault;
+        address gauge;
+        uint256 balance;
+        uint256 boostedBalance;
+        uint256 nextBoostedBalance;
+        uint256 earned;
+    }
+
+    /**
+    @return number of vaults with a gauge in `_registry`.
+    */
+    function gaugeCount(address _registry) external view returns (uint256) {
+        return IRegistry(_registry).getVaults().length;
+    }
+
+    /**
+    @notice Stats of the gauges of `_registry`.
+    @param _registry registry listing the gauges
+    @param _offset index of the first vault
+    @param _limit maximum number of gauges returned
+    @return stats of the gauges, in the order of `Registry.getVaults()`.
+    */
+    function getGaugeStats(
+        address _registry,
+        uint256 _offset,
+        uint256 _limit
+    ) external view returns (GaugeStats[] memory stats) {
+        address[] memory vaults = _page(_registry, _offset, _limit);
+        stats = new GaugeStats[](vaults.length);
+        for (uint256 i = 0; i < vaults.length; ++i) {
+            address gauge = IRegistry(_registry).gauges(vaults[i]);
+            IGaugeViews g = IGaugeViews(gauge);
+            stats[i] = GaugeStats({
+                vault: vaults[i],
+                gauge: gauge,
+                totalAssets: g.totalAssets(),
+                rewardRate: g.rewardRate(),
+                periodFinish: g.periodFinish(),
+                queuedRewards: g.queuedRewards(),
+                rewardPerToken: g.rewardPerToken()
+            });
+        }
+    }
+
+    /**
+    @notice Positions of `_account` in the gauges of `_registry`.
+    @param _registry registry listing the gauges
+    @param _account account to look positions for
+    @param _offset index of the first vault
+    @param _limit maximum number of gauges returned
+    @return positions in the order of `Registry.getVaults()`, including empty ones.
+    */
+    function getPositions(
+        address _registry,
+        address _account,
+        uint256 _offset,
+        uint256 _limit
+    ) external view returns (Position[] memory positions) {
+        address[] memory vaults = _page(_registry, _offset, _limit);
+        positions = new Position[](vaults.length);
+        for (uint256 i = 0; i < vaults.length; ++i) {
+            address gauge = IRegistry(_registry).gauges(vaults[i]);
+            IGaugeViews g = IGaugeViews(gauge);
+            positions[i] = Position({
+                vault: vaults[i],
+                gauge: gauge,
+                balance: g.balanceOf(_account),
+                boostedBalance: g.boostedBalanceOf(_account),
+                nextBoostedBalance: g.nextBoostedBalanceOf(_account),
+                earned: g.earned(_account)
+            });
+        }
+    }
+
+    function _page(
+        address _registry,
+        uint256 _offset,
+        uint256 _limit
+    ) internal view returns (address[] memory page) {
+        address[] memory vaults = IRegistry(_registry).getVaults();
+        if (_offset >= vaults.length) {
+            return page;
+        }
+        uint256 length = vaults.length - _offset;
+        if (_limit < length) {
+            length = _limit;
+        }
+        page = new address[](length);
+        for (uint256 i = 0; i < page.length; ++i) {
+            page[i] = vaults[_offset + i];
+        }
+    }
+}
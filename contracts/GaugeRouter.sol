@@ -0,0 +1,96 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.15;
+
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+import "@openzeppelin/contracts/token/ERC20/utils/SafeERC20.sol";
+import "./interfaces/IGauge.sol";
+import "./interfaces/IRegistry.sol";
+
+/** @title Gauge router
+    @notice Claim, deposit and withdraw across several gauges of a registry in one transaction.
+    @dev
+     Rewards are claimed with `Gauge.getReward(account)`, so they are sent to the
+     recipient set by the account in each gauge, if any.
+     Each gauge reads the veYFI balance and supply itself: the router cannot pass
+     them in without trusting the caller, but after the first gauge these reads
+     only touch warm storage.
+ */
+
+contract GaugeRouter {
+    using SafeERC20 for IERC20;
+
+    address public immutable REGISTRY;
+
+    constructor(address _registry) {
+        require(_registry != address(0x0), "_registry 0x0 address");
+        REGISTRY = _registry;
+    }
+
+    /**
+    @notice Claim the rewards of msg.sender in `_gauges`.
+    @param _gauges gauges to claim from
+    */
+    function claim(address[] calldata _gauges) external {
+        for (uint256 i = 0; i < _gauges.length; ++i) {
+            _requireGauge(_gauges[i]);
+            IGauge(_gauges[i]).getReward(msg.sender);
+        }
+    }
+
+    /**
+    @notice Deposit vault tokens of msg.sender into `_gauges`.
+    @dev The router must be approved to spend the vault tokens.
+    @param _gauges gauges to deposit to
+    @param _assets amount of vault tokens to deposit in each gauge
+    @param _claim claim the rewards of msg.sender in each gauge
+    */
+    function deposit(
+        address[] calldata _gauges,
+        uint256[] calldata _assets,
+        bool _claim
+    ) external {
+        require(_gauges.length == _assets.length, "length mismatch");
+        for (uint256 i = 0; i < _gauges.length; ++i) {
+            address gauge = _gauges[i];
+            _requireGauge(gauge);
+            IERC20 asset = IGauge(gauge).asset();
+            asset.safeTransferFrom(msg.sender, address(this), _assets[i]);
+            asset.safeApprove(gauge, _assets[i]);
+            IGauge(gauge).deposit(_assets[i], msg.sender);
+            if (_claim) {
+                IGauge(gauge).getReward(msg.sender);
+            }
+        }
+    }
+
+    /**
+    @notice Withdraw vault tokens of msg.sender from `_gauges`.
+    @dev The router must be approved to spend the gauge shares.
+    @param _gauges gauges to withdraw from
+    @param _assets amount of vault tokens to withdraw from each gauge, type(uint256).max for the whole balance
+    @param _claim claim the rewards of msg.sender in each gauge
+    */
+    function withdraw(
+        address[] calldata _gauges,
+        uint256[] calldata _assets,
+        bool _claim
+    ) external {
+        require(_gauges.length == _assets.length, "length mismatch");
+        for (uint256 i = 0; i < _gauges.length; ++i) {
+            address gauge = _gauges[i];
+            _requireGauge(gauge);
+            uint256 assets = _assets[i];
+            if (assets == type(uint256).max) {
+                assets = IGauge(gauge).balanceOf(msg.sender);
+            }
+            IGauge(gauge).withdraw(assets, msg.sender, msg.sender);
+            if (_claim) {
+                IGauge(gauge).getReward(msg.sender);
+            }
+        }
+    }
+
+    function _requireGauge(address _gauge) internal view {
+        require(IRegistry(REGISTRY).isGauge(_gauge), "!gauge");
+    }
+}
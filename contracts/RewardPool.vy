@@ -12,8 +12,12 @@ interface VotingYFI:
     def checkpoint(): nonpayable
     def token() -> ERC20: view
     def modify_lock(amount: uint256, unlock_time: uint256, user: address) -> LockedBalance: nonpayable
-    def balanceOf(addr: address, epoch: uint256) -> uint256: view
     def find_epoch_by_timestamp(user: address, ts: uint256) -> uint256: view 
+    def locked(user: address) -> LockedBalance: view
+    def point_at(user: address, ts: uint256) -> Point: view
+    def slope_changes(addr: address, ts: uint256) -> int128: view
+    def totalSupply(ts: uint256) -> uint256: view
+    def weekly_supply(week: uint256) -> uint256: view
 
 event Initialized:
     veyfi: VotingYFI
@@ -51,6 +55,8 @@ struct LockedBalance:
 
 WEEK: constant(uint256) = 7 * 86400
 TOKEN_CHECKPOINT_DEADLINE: constant(uint256) = 86400
+MAX_CLAIM_WEEKS: constant(uint256) = 500
+MAX_CLAIM_USERS: constant(uint256) = 500
 
 YFI: immutable(ERC20)
 VEYFI: immutable(VotingYFI)
@@ -139,14 +145,8 @@ def _checkpoint_total_supply():
         if t > rounded_timestamp:
             break
         else:
-            epoch: uint256 = VEYFI.find_epoch_by_timestamp(VEYFI.address, t)
-            pt: Point = VEYFI.point_history(VEYFI.address, epoch)
-            dt: int128 = 0
-            if t > pt.ts:
-                # If the point is at 0 epoch, it can actually be earlier than the first deposit
-                # Then make dt 0
-                dt = convert(t - pt.ts, int128)
-            self.ve_supply[t] = convert(max(pt.bias - pt.slope * dt, 0), uint256)
+            # VEYFI.checkpoint() recorded the supply of every week up to now
+            self.ve_supply[t] = VEYFI.weekly_supply(t)
         t += WEEK
 
     self.time_cursor = t
@@ -163,39 +163,93 @@ def checkpoint_total_supply():
     self._checkpoint_total_supply()
 
 
+@view
+@internal
+def _user_point(addr: address, ts: uint256, max_user_epoch: uint256) -> (Point, uint256):
+    """
+    @notice Load the user point carried to `ts` and the time of the next user epoch
+    """
+    user_epoch: uint256 = VEYFI.find_epoch_by_timestamp(addr, ts)
+    next_epoch_time: uint256 = max_value(uint256)
+    if user_epoch < max_user_epoch:
+        next_epoch_time = VEYFI.point_history(addr, user_epoch + 1).ts
+    return VEYFI.point_at(addr, ts), next_epoch_time
+
+
+@view
 @internal
-def _claim(addr: address, last_token_time: uint256) -> uint256:
+def _claimable(addr: address, last_token_time: uint256, max_weeks: uint256, live_supply: bool) -> (uint256, uint256, uint256, uint256):
+    """
+    @notice Compute the fees of `addr` for at most `max_weeks` weeks before `last_token_time`
+    @dev
+        Weeks past the total supply checkpoint are only priced at the current
+        veYFI supply when `live_supply` is set, for the view. A claim divides
+        by the unrecorded zero supply of these weeks and reverts, until
+        `checkpoint_total_supply` catches up.
+    @return amount, week cursor the claim starts from, resulting week cursor, max user epoch
+    """
     to_distribute: uint256 = 0
 
     max_user_epoch: uint256 = VEYFI.epoch(addr)
     _start_time: uint256 = self.start_time
+    time_cursor: uint256 = self.time_cursor
+    week_cursor: uint256 = self.time_cursor_of[addr]
 
     if max_user_epoch == 0:
         # No lock = no fees
-        return 0
-
-    week_cursor: uint256 = self.time_cursor_of[addr]
+        return 0, week_cursor, week_cursor, 0
 
     if week_cursor == 0:
-        user_point: Point = VEYFI.point_history(addr, 1)
-        week_cursor = (user_point.ts + WEEK - 1) / WEEK * WEEK
+        first_point: Point = VEYFI.point_history(addr, 1)
+        week_cursor = (first_point.ts + WEEK - 1) / WEEK * WEEK
+    start_cursor: uint256 = week_cursor
 
     if week_cursor >= last_token_time:
-        return 0
+        return 0, start_cursor, week_cursor, max_user_epoch
 
     if week_cursor < _start_time:
         week_cursor = _start_time
 
+    # Load the user point once and carry it forward week by week,
+    # it is only read again when the user has a new epoch.
+    user_point: Point = empty(Point)
+    next_epoch_time: uint256 = 0
+    user_point, next_epoch_time = self._user_point(addr, week_cursor, max_user_epoch)
+
     # Iterate over weeks
-    for i in range(50):
-        if week_cursor >= last_token_time:
+    for i in range(MAX_CLAIM_WEEKS):
+        if i >= max_weeks or week_cursor >= last_token_time:
             break
-        balance_of: uint256 = VEYFI.balanceOf(addr, week_cursor)
+        if week_cursor >= next_epoch_time:
+            user_point, next_epoch_time = self._user_point(addr, week_cursor, max_user_epoch)
+        elif week_cursor > user_point.ts:
+            user_point.bias -= user_point.slope * convert(week_cursor - user_point.ts, int128)
+            user_point.slope += VEYFI.slope_changes(addr, week_cursor)
+            user_point.ts = week_cursor
+        balance_of: uint256 = convert(max(user_point.bias, 0), uint256)
         if balance_of == 0:
             break
-        to_distribute += balance_of * self.tokens_per_week[week_cursor] / self.ve_supply[week_cursor]
+        ve_supply: uint256 = self.ve_supply[week_cursor]
+        if live_supply and week_cursor >= time_cursor:
+            ve_supply = VEYFI.totalSupply(week_cursor)
+        to_distribute += balance_of * self.tokens_per_week[week_cursor] / ve_supply
         week_cursor += WEEK
 
+    return to_distribute, start_cursor, week_cursor, max_user_epoch
+
+
+@internal
+def _claim(addr: address, last_token_time: uint256, max_weeks: uint256) -> uint256:
+    to_distribute: uint256 = 0
+    start_cursor: uint256 = 0
+    week_cursor: uint256 = 0
+    max_user_epoch: uint256 = 0
+    to_distribute, start_cursor, week_cursor, max_user_epoch = self._claimable(addr, last_token_time, max_weeks, False)
+
+    # no week was claimed, keep the stored cursor
+    if week_cursor == start_cursor:
+        return 0
+
     self.time_cursor_of[addr] = week_cursor
 
     log Claimed(addr, to_distribute, week_cursor, max_user_epoch)
@@ -203,20 +257,36 @@ def _claim(addr: address, last_token_time: uint256) -> uint256:
     return to_distribute
 
 
+@view
 @external
-@nonreentrant('lock')
-def claim(user: address = msg.sender, relock: bool = False) -> uint256:
+def claimable(user: address, max_weeks: uint256 = 50) -> (uint256, uint256):
     """
-    @notice Claim fees for a user
-    @dev 
-        Each call to claim looks at a maximum of 50 user veYFI points.
-        For accounts with many veYFI related actions, this function
-        may need to be called more than once to claim all available
-        fees. In the `Claimed` event that fires, if `claim_epoch` is
-        less than `max_epoch`, the account may claim again.
-    @param user account to claim the fees for
-    @param relock whether to increase the lock from the claimed fees
-    @return uint256 amount of the claimed fees
+    @notice Get the fees `user` can claim without claiming them
+    @dev
+        Only tokens that are already checkpointed are counted, calling
+        `checkpoint_token` first makes the result match what `claim`
+        would pay in this block. If the returned cursor is before the
+        current week, the user has more weeks left to claim. Weeks the
+        total supply checkpoint hasn't reached yet are priced at the
+        veYFI supply, a claim over them reverts until they are checkpointed.
+    @param user account to look up the fees for
+    @param max_weeks maximum number of weeks to look at
+    @return amount of claimable fees, week cursor after the claim
+    """
+    last_token_time: uint256 = self.last_token_time / WEEK * WEEK
+    amount: uint256 = 0
+    start_cursor: uint256 = 0
+    week_cursor: uint256 = 0
+    max_user_epoch: uint256 = 0
+    amount, start_cursor, week_cursor, max_user_epoch = self._claimable(user, last_token_time, max_weeks, True)
+    return amount, week_cursor
+
+
+@internal
+def _checkpoint_for_claim() -> uint256:
+    """
+    @notice Bring the supply and token checkpoints up to date before claiming
+    @return Start of the week up to which fees can be claimed
     """
     if block.timestamp >= self.time_cursor:
         self._checkpoint_total_supply()
@@ -227,21 +297,76 @@ def claim(user: address = msg.sender, relock: bool = False) -> uint256:
         self._checkpoint_token()
         last_token_time = block.timestamp
 
-    last_token_time = last_token_time / WEEK * WEEK
+    return last_token_time / WEEK * WEEK
+
+
+@internal
+def _send(user: address, amount: uint256, relock: bool):
+    # you can only relock for yourself
+    if relock and (msg.sender == user or self.allowed_to_relock[user][msg.sender]):
+        YFI.approve(VEYFI.address, amount)
+        VEYFI.modify_lock(amount, 0, user)
+    else:
+        assert YFI.transfer(user, amount)
+
+
+@external
+@nonreentrant('lock')
+def claim(user: address = msg.sender, relock: bool = False, max_weeks: uint256 = 50) -> uint256:
+    """
+    @notice Claim fees for a user
+    @dev 
+        Each call to claim looks at a maximum of `max_weeks` weeks.
+        For accounts with many unclaimed weeks, this function
+        may need to be called more than once to claim all available
+        fees. In the `Claimed` event that fires, if `week_cursor` is
+        before the current week, the account may claim again.
+    @param user account to claim the fees for
+    @param relock whether to increase the lock from the claimed fees
+    @param max_weeks maximum number of weeks to claim, at most MAX_CLAIM_WEEKS
+    @return uint256 amount of the claimed fees
+    """
+    last_token_time: uint256 = self._checkpoint_for_claim()
 
-    amount: uint256 = self._claim(user, last_token_time)
+    amount: uint256 = self._claim(user, last_token_time, max_weeks)
     if amount != 0:
-        # you can only relock for yourself
-        if relock and (msg.sender == user or self.allowed_to_relock[user][msg.sender]):
-            YFI.approve(VEYFI.address, amount)
-            VEYFI.modify_lock(amount, 0, user)
-        else:
-            assert YFI.transfer(user, amount)
+        self._send(user, amount, relock)
         self.token_last_balance -= amount
 
     return amount
 
 
+@external
+@nonreentrant('lock')
+def claim_many(users: DynArray[address, MAX_CLAIM_USERS], relock: bool = False, max_weeks: uint256 = 50) -> DynArray[uint256, MAX_CLAIM_USERS]:
+    """
+    @notice Claim fees for many users at once
+    @dev
+        The supply and token checkpoints are done once for the whole batch.
+        Fees are relocked only for the users who allowed the caller to relock
+        and whose lock hasn't expired, the others receive them.
+    @param users accounts to claim the fees for
+    @param relock whether to increase the locks from the claimed fees
+    @param max_weeks maximum number of weeks to claim per user
+    @return amounts claimed for each user, in the same order
+    """
+    last_token_time: uint256 = self._checkpoint_for_claim()
+
+    amounts: DynArray[uint256, MAX_CLAIM_USERS] = []
+    total: uint256 = 0
+    for user in users:
+        amount: uint256 = self._claim(user, last_token_time, max_weeks)
+        if amount != 0:
+            # an expired lock can't be relocked, send the fees instead of failing the batch
+            self._send(user, amount, relock and VEYFI.locked(user).end > block.timestamp)
+            total += amount
+        amounts.append(amount)
+
+    self.token_last_balance -= total
+
+    return amounts
+
+
 @external
 def burn(amount: uint256 = max_value(uint256)) -> bool:
     """
@@ -22,6 +22,10 @@ struct Point:
     ts: uint256
     blk: uint256  # block
 
+struct PackedPoint:
+    bias_slope: uint256  # bias in the low 128 bits, slope in the high 128 bits
+    ts_blk: uint256  # ts in the low 64 bits, blk in the next 64 bits
+
 struct LockedBalance:
     amount: uint256
     end: uint256
@@ -69,13 +73,19 @@ MAX_LOCK_DURATION: constant(uint256) = 4 * 365 * 86400 / WEEK * WEEK  # 4 years
 SCALE: constant(uint256) = 10 ** 18
 MAX_PENALTY_RATIO: constant(uint256) = SCALE * 3 / 4  # 75% for early exit of max lock
 MAX_N_WEEKS: constant(uint256) = 522
+MAX_N_WEEK_WORDS: constant(uint256) = MAX_N_WEEKS / 256 + 2  # bitmap words spanned by MAX_N_WEEKS weeks
+MAX_BATCH: constant(uint256) = 500  # max number of entries in batched views
+MASK_64: constant(uint256) = 2 ** 64 - 1
+MASK_128: constant(uint256) = 2 ** 128 - 1
 
 supply: public(uint256)
 locked: public(HashMap[address, LockedBalance])
 # history
 epoch: public(HashMap[address, uint256])
-point_history: public(HashMap[address, HashMap[uint256, Point]])  # epoch -> unsigned point
-slope_changes: public(HashMap[address, HashMap[uint256, int128]])  # time -> signed slope change
+packed_point_history: HashMap[address, HashMap[uint256, PackedPoint]]  # epoch -> unsigned point
+packed_slope_changes: HashMap[address, HashMap[uint256, uint256]]  # week / 2 -> signed slope changes of the even and odd week
+slope_change_weeks: HashMap[address, HashMap[uint256, uint256]]  # week / 256 -> bitmap of weeks with a slope change
+weekly_supply: public(HashMap[uint256, uint256])  # week -> total voting power at the start of the week
 
 
 @external
@@ -87,8 +97,7 @@ def __init__(token: ERC20, reward_pool: RewardPool):
     """
     YFI = token
     REWARD_POOL = reward_pool
-    self.point_history[self][0].blk = block.number
-    self.point_history[self][0].ts = block.timestamp
+    self.packed_point_history[self][0].ts_blk = block.timestamp | shift(block.number, 64)
 
     log Initialized(token, reward_pool)
 
@@ -102,7 +111,31 @@ def get_last_user_point(addr: address) -> Point:
     @return Last recorded point
     """
     epoch: uint256 = self.epoch[addr]
-    return self.point_history[addr][epoch]
+    return self._point_history(addr, epoch)
+
+
+@view
+@external
+def point_history(addr: address, epoch: uint256) -> Point:
+    """
+    @notice Get the point recorded for a user at `epoch`
+    @param addr Address of the user wallet, or this contract for the global points
+    @param epoch Epoch of the point
+    @return Recorded point
+    """
+    return self._point_history(addr, epoch)
+
+
+@view
+@external
+def slope_changes(addr: address, ts: uint256) -> int128:
+    """
+    @notice Get the slope change scheduled for a user at `ts`
+    @param addr Address of the user wallet, or this contract for the global slope changes
+    @param ts Epoch time of the slope change
+    @return Signed slope change
+    """
+    return self._slope_change(addr, ts)
 
 
 @pure
@@ -111,6 +144,66 @@ def round_to_week(ts: uint256) -> uint256:
     return ts / WEEK * WEEK
 
 
+@pure
+@internal
+def pack_int128(x: int128) -> uint256:
+    """
+    @dev 128 bit two's complement of `x`
+    """
+    if x < 0:
+        return convert(convert(x, int256) + 2 ** 128, uint256)
+    return convert(x, uint256)
+
+
+@pure
+@internal
+def unpack_int128(word: uint256) -> int128:
+    """
+    @dev Signed value of the 128 bit two's complement in the low bits of `word`
+    """
+    x: uint256 = word & MASK_128
+    if x > convert(max_value(int128), uint256):
+        return convert(convert(x, int256) - 2 ** 128, int128)
+    return convert(x, int128)
+
+
+@view
+@internal
+def _point_history(user: address, epoch: uint256) -> Point:
+    packed: PackedPoint = self.packed_point_history[user][epoch]
+    return Point({
+        bias: self.unpack_int128(packed.bias_slope),
+        slope: self.unpack_int128(shift(packed.bias_slope, -128)),
+        ts: packed.ts_blk & MASK_64,
+        blk: shift(packed.ts_blk, -64)
+    })
+
+
+@internal
+def _record_point(user: address, epoch: uint256, point: Point):
+    """
+    @dev
+        Points are stored in two slots instead of four.
+        Timestamps and block numbers fit in 64 bits.
+    """
+    self.packed_point_history[user][epoch] = PackedPoint({
+        bias_slope: self.pack_int128(point.bias) | shift(self.pack_int128(point.slope), 128),
+        ts_blk: point.ts | shift(point.blk, 64)
+    })
+
+
+@view
+@internal
+def _slope_change(user: address, ts: uint256) -> int128:
+    """
+    @dev Slope changes are only scheduled on week boundaries, other timestamps read 0
+    """
+    if ts % WEEK != 0:
+        return 0
+    week: uint256 = ts / WEEK
+    return self.unpack_int128(shift(self.packed_slope_changes[user][week / 2], -convert(week % 2 * 128, int256)))
+
+
 @view
 @internal
 def lock_to_point(lock: LockedBalance) -> Point:
@@ -140,6 +233,46 @@ def lock_to_kink(lock: LockedBalance) -> Kink:
     return kink
 
 
+@internal
+def _mark_slope_change_week(user: address, ts: uint256):
+    """
+    @dev
+        Flag the week of `ts` in the `user` week bitmap.
+        Flags are never cleared, a week whose slope change cancelled out is only a wasted lookup.
+    """
+    week: uint256 = ts / WEEK
+    bit: uint256 = shift(1, convert(week % 256, int256))
+    word: uint256 = self.slope_change_weeks[user][week / 256]
+    if word & bit == 0:
+        self.slope_change_weeks[user][week / 256] = word | bit
+
+
+@internal
+def _add_slope_change(user: address, ts: uint256, d_slope: int128):
+    """
+    @dev
+        Two consecutive weeks share a slot, the even week in the low 128 bits
+        and the odd week in the high 128 bits.
+    """
+    week: uint256 = ts / WEEK
+    offset: int256 = convert(week % 2 * 128, int256)
+    word: uint256 = self.packed_slope_changes[user][week / 2]
+    old: uint256 = shift(word, -offset) & MASK_128
+    new: uint256 = self.pack_int128(self.unpack_int128(old) + d_slope)
+    self.packed_slope_changes[user][week / 2] = word ^ shift(old ^ new, offset)
+
+
+@internal
+def _schedule_slope_change(user: address, ts: uint256, d_slope: int128):
+    """
+    @notice Add `d_slope` to the slope changes at `ts` for both `user` and the global account
+    """
+    self._add_slope_change(self, ts, d_slope)
+    self._add_slope_change(user, ts, d_slope)
+    self._mark_slope_change_week(self, ts)
+    self._mark_slope_change_week(user, ts)
+
+
 @internal
 def _checkpoint_user(user: address, old_lock: LockedBalance, new_lock: LockedBalance) -> Point[2]:
     old_point: Point = self.lock_to_point(old_lock)
@@ -150,34 +283,28 @@ def _checkpoint_user(user: address, old_lock: LockedBalance, new_lock: LockedBal
 
     # schedule slope changes for the lock end
     if old_point.slope != 0 and old_lock.end > block.timestamp:
-        self.slope_changes[self][old_lock.end] += old_point.slope
-        self.slope_changes[user][old_lock.end] += old_point.slope
+        self._schedule_slope_change(user, old_lock.end, old_point.slope)
     if new_point.slope != 0 and new_lock.end > block.timestamp:
-        self.slope_changes[self][new_lock.end] -= new_point.slope
-        self.slope_changes[user][new_lock.end] -= new_point.slope
+        self._schedule_slope_change(user, new_lock.end, -new_point.slope)
 
     # schedule kinks for locks longer than max duration
     if old_kink.slope != 0:
-        self.slope_changes[self][old_kink.ts] -= old_kink.slope
-        self.slope_changes[user][old_kink.ts] -= old_kink.slope
-        self.slope_changes[self][old_lock.end] += old_kink.slope
-        self.slope_changes[user][old_lock.end] += old_kink.slope
+        self._schedule_slope_change(user, old_kink.ts, -old_kink.slope)
+        self._schedule_slope_change(user, old_lock.end, old_kink.slope)
     if new_kink.slope != 0:
-        self.slope_changes[self][new_kink.ts] += new_kink.slope
-        self.slope_changes[user][new_kink.ts] += new_kink.slope
-        self.slope_changes[self][new_lock.end] -= new_kink.slope
-        self.slope_changes[user][new_lock.end] -= new_kink.slope
+        self._schedule_slope_change(user, new_kink.ts, new_kink.slope)
+        self._schedule_slope_change(user, new_lock.end, -new_kink.slope)
 
     self.epoch[user] += 1
-    self.point_history[user][self.epoch[user]] = new_point
+    self._record_point(user, self.epoch[user], new_point)
     return [old_point, new_point]
 
 @internal
-def _checkpoint_global() -> Point:
+def _checkpoint_global(max_weeks: uint256) -> Point:
     last_point: Point = Point({bias: 0, slope: 0, ts: block.timestamp, blk: block.number})
     epoch: uint256 = self.epoch[self]
     if epoch > 0:
-        last_point = self.point_history[self][epoch]
+        last_point = self._point_history(self, epoch)
     last_checkpoint: uint256 = last_point.ts
     # initial_last_point is used for extrapolation to calculate block number
     initial_last_point: Point = last_point
@@ -189,8 +316,11 @@ def _checkpoint_global() -> Point:
     t_i: uint256 = self.round_to_week(last_checkpoint)
     for i in range(255):
         t_i = min(t_i + WEEK, block.timestamp)
+        # stop at the last recorded week, the next checkpoint resumes from there
+        if i == max_weeks and t_i < block.timestamp:
+            break
         last_point.bias -= last_point.slope * convert(t_i - last_checkpoint, int128)
-        last_point.slope += self.slope_changes[self][t_i]  # will read 0 if not aligned to week
+        last_point.slope += self._slope_change(self, t_i)  # will read 0 if not aligned to week
         last_point.bias = max(0, last_point.bias)  # this can happen
         last_point.slope = max(0, last_point.slope)  # this shouldn't happen
         last_checkpoint = t_i
@@ -198,7 +328,8 @@ def _checkpoint_global() -> Point:
         last_point.blk = initial_last_point.blk + block_slope * (t_i - initial_last_point.ts) / SCALE
         epoch += 1
         if t_i < block.timestamp:
-            self.point_history[self][epoch] = last_point
+            self._record_point(self, epoch, last_point)
+            self.weekly_supply[t_i] = convert(last_point.bias, uint256)
         # skip last week
         else:
             last_point.blk = block.number
@@ -222,7 +353,7 @@ def _checkpoint(user: address, old_lock: LockedBalance, new_lock: LockedBalance)
         user_points = self._checkpoint_user(user, old_lock, new_lock)
 
     # fill point_history until t=now
-    last_point: Point = self._checkpoint_global()
+    last_point: Point = self._checkpoint_global(255)
     
     # only affects the last checkpoint at t=now
     if user != empty(address):
@@ -235,15 +366,49 @@ def _checkpoint(user: address, old_lock: LockedBalance, new_lock: LockedBalance)
 
     # Record the changed point into history
     epoch: uint256 = self.epoch[self]
-    self.point_history[self][epoch] = last_point
+    self._record_point(self, epoch, last_point)
+    if last_point.ts % WEEK == 0:
+        self.weekly_supply[last_point.ts] = convert(last_point.bias, uint256)
 
 
 @external
-def checkpoint():
+def checkpoint(max_weeks: uint256 = 255):
     """
     @notice Record global data to checkpoint
+    @dev
+        After a long inactivity the global history has to be filled week by week.
+        A keeper can split that work in several calls with `max_weeks`,
+        see `pending_weeks`.
+    @param max_weeks Maximum number of weeks to record
+    """
+    if self._pending_weeks() > max_weeks:
+        self._checkpoint_global(max_weeks)
+    else:
+        self._checkpoint(empty(address), empty(LockedBalance), empty(LockedBalance))
+
+
+@view
+@internal
+def _pending_weeks() -> uint256:
+    epoch: uint256 = self.epoch[self]
+    # the first checkpoint starts from the current time
+    if epoch == 0:
+        return 0
+    last_checkpoint: uint256 = self.packed_point_history[self][epoch].ts_blk & MASK_64
+    if block.timestamp <= last_checkpoint:
+        return 0
+    return (block.timestamp - 1) / WEEK - last_checkpoint / WEEK
+
+
+@view
+@external
+def pending_weeks() -> uint256:
+    """
+    @notice Number of weeks the global history is behind
+    @dev The next global checkpoint records one point for each of these weeks.
+    @return Number of weeks
     """
-    self._checkpoint(empty(address), empty(LockedBalance), empty(LockedBalance))
+    return self._pending_weeks()
 
 
 @external
@@ -356,7 +521,7 @@ def find_epoch_by_block(user: address, height: uint256, max_epoch: uint256) -> u
         if _min >= _max:
             break
         _mid: uint256 = (_min + _max + 1) / 2
-        if self.point_history[user][_mid].blk <= height:
+        if shift(self.packed_point_history[user][_mid].ts_blk, -64) <= height:
             _min = _mid
         else:
             _max = _mid - 1
@@ -383,13 +548,51 @@ def _find_epoch_by_timestamp(user: address, ts: uint256, max_epoch: uint256) ->
         if _min >= _max:
             break
         _mid: uint256 = (_min + _max + 1) / 2
-        if self.point_history[user][_mid].ts <= ts:
+        if self.packed_point_history[user][_mid].ts_blk & MASK_64 <= ts:
             _min = _mid
         else:
             _max = _mid - 1
     return _min
 
 
+@pure
+@internal
+def lowest_bit(word: uint256) -> uint256:
+    """
+    @dev Index of the least significant set bit of a non-zero `word`
+    """
+    if word & 1 != 0:
+        return 0
+    x: uint256 = word
+    n: uint256 = 0
+    for s in [128, 64, 32, 16, 8, 4, 2, 1]:
+        if x & (shift(1, convert(s, int256)) - 1) == 0:
+            x = shift(x, -convert(s, int256))
+            n += s
+    return n
+
+
+@view
+@internal
+def next_slope_change(user: address, t: uint256, t_max: uint256) -> uint256:
+    """
+    @notice Find the first week from `t` with a scheduled slope change for `user`
+    @param t Week aligned timestamp to start searching from
+    @param t_max Don't go beyond this timestamp
+    @return Timestamp of the week, `t_max` if there is none before it
+    """
+    week: uint256 = t / WEEK
+    for i in range(MAX_N_WEEK_WORDS):
+        if week * WEEK >= t_max:
+            break
+        offset: uint256 = week % 256
+        word: uint256 = shift(self.slope_change_weeks[user][week / 256], -convert(offset, int256))
+        if word != 0:
+            return min((week + self.lowest_bit(word)) * WEEK, t_max)
+        week += 256 - offset
+    return t_max
+
+
 @view
 @internal
 def replay_slope_changes(user: address, point: Point, ts: uint256) -> Point:
@@ -398,26 +601,78 @@ def replay_slope_changes(user: address, point: Point, ts: uint256) -> Point:
         If the `ts` is higher than MAX_N_WEEKS weeks ago, this function will return the 
         balance at exactly MAX_N_WEEKS weeks instead of `ts`. 
         MAX_N_WEEKS weeks is considered sufficient to cover the `MAX_LOCK_DURATION` period.
+        Only the weeks flagged in `slope_change_weeks` are visited, the bias decays
+        linearly in between. Within the week of the last checkpoint this is a
+        single extrapolation, which keeps current balances and supply cheap.
+    """
+    upoint: Point = self.carry_slope_changes(user, point, ts)
+    upoint.bias = max(0, upoint.bias)
+    return upoint
+
+
+@view
+@internal
+def carry_slope_changes(user: address, point: Point, ts: uint256) -> Point:
+    """
+    @dev
+        Same as `replay_slope_changes` without flooring the bias at 0, so the
+        result can be carried further without rounding differences.
     """
     upoint: Point = point
     t_i: uint256 = self.round_to_week(upoint.ts)
 
+    # the point is in the same week as `ts`, there is no slope change in between
+    if ts < t_i + WEEK:
+        upoint.bias -= upoint.slope * convert(ts - upoint.ts, int128)
+        return upoint
+
+    t_max: uint256 = min(ts, t_i + MAX_N_WEEKS * WEEK)
     for i in range(MAX_N_WEEKS):
-        t_i += WEEK
-        d_slope: int128 = 0
-        if t_i > ts:
-            t_i = ts
-        else:
-            d_slope = self.slope_changes[user][t_i]
+        t_i = self.next_slope_change(user, t_i + WEEK, t_max)
         upoint.bias -= upoint.slope * convert(t_i - upoint.ts, int128)
-        if t_i == ts:
+        if t_i == t_max:
             break
-        upoint.slope += d_slope
+        upoint.slope += self._slope_change(user, t_i)
         upoint.ts = t_i
-    
-    upoint.bias = max(0, upoint.bias)
+
     return upoint
 
+
+@view
+@internal
+def _balances_at(user: address, timestamps: DynArray[uint256, MAX_BATCH]) -> DynArray[uint256, MAX_BATCH]:
+    """
+    @notice Get the voting power of `user` at each of `timestamps`
+    @dev
+        `timestamps` must be sorted in ascending order. The point is carried from
+        one timestamp to the next and is only reloaded when a later epoch starts,
+        so slope changes are replayed once for the whole batch.
+    """
+    balances: DynArray[uint256, MAX_BATCH] = []
+    max_epoch: uint256 = self.epoch[user]
+    epoch: uint256 = 0
+    upoint: Point = empty(Point)
+    last_ts: uint256 = 0
+    for ts in timestamps:
+        assert ts >= last_ts  # dev: timestamps must be sorted
+        last_ts = ts
+        ts_epoch: uint256 = 0
+        if max_epoch > 0:
+            ts_epoch = self._find_epoch_by_timestamp(user, ts, max_epoch)
+        if ts_epoch == 0:
+            balances.append(0)
+            continue
+        if ts_epoch != epoch:
+            epoch = ts_epoch
+            upoint = self._point_history(user, epoch)
+        if ts > upoint.ts:
+            upoint = self.carry_slope_changes(user, upoint, ts)
+            if ts % WEEK == 0:
+                upoint.slope += self._slope_change(user, ts)
+            upoint.ts = ts
+        balances.append(convert(max(0, upoint.bias), uint256))
+    return balances
+
 @view
 @internal
 def _balanceOf(user: address, ts: uint256 = block.timestamp) -> uint256:
@@ -432,7 +687,7 @@ def _balanceOf(user: address, ts: uint256 = block.timestamp) -> uint256:
         return 0
     if ts != block.timestamp:
         epoch = self._find_epoch_by_timestamp(user, ts, epoch)
-    upoint: Point = self.point_history[user][epoch]
+    upoint: Point = self._point_history(user, epoch)
     
     upoint = self.replay_slope_changes(user, upoint, ts)
 
@@ -451,6 +706,59 @@ def balanceOf(user: address, ts: uint256 = block.timestamp) -> uint256:
     return self._balanceOf(user, ts)
 
 
+@view
+@external
+def balanceOfMany(users: DynArray[address, MAX_BATCH], ts: uint256 = block.timestamp) -> DynArray[uint256, MAX_BATCH]:
+    """
+    @notice Get the voting power of several users
+    @param users User wallet addresses
+    @param ts Epoch time to return voting power at
+    @return Voting power of each user
+    """
+    balances: DynArray[uint256, MAX_BATCH] = []
+    for user in users:
+        balances.append(self._balanceOf(user, ts))
+    return balances
+
+
+@view
+@external
+def balanceOfAt(user: address, timestamps: DynArray[uint256, MAX_BATCH]) -> DynArray[uint256, MAX_BATCH]:
+    """
+    @notice Get the voting power of `user` at several times
+    @param user User wallet address
+    @param timestamps Epoch times to return voting power at, in ascending order
+    @return Voting power at each time
+    """
+    return self._balances_at(user, timestamps)
+
+
+@view
+@external
+def point_at(user: address, ts: uint256) -> Point:
+    """
+    @notice Get the point of `user` carried forward to `ts`
+    @dev
+        `bias` is the voting power at `ts` and `slope` includes the slope change
+        scheduled at `ts`, so the point can be carried to the following weeks
+        by applying `slope_changes` one week at a time.
+    @param user User wallet address
+    @param ts Epoch time to carry the point to
+    @return Point at `ts`
+    """
+    epoch: uint256 = self.epoch[user]
+    if epoch == 0:
+        return empty(Point)
+    epoch = self._find_epoch_by_timestamp(user, ts, epoch)
+    point: Point = self._point_history(user, epoch)
+
+    upoint: Point = self.replay_slope_changes(user, point, ts)
+    if ts > point.ts and ts % WEEK == 0:
+        upoint.slope += self._slope_change(user, ts)
+    upoint.ts = ts
+    return upoint
+
+
 @view
 @external
 def getPriorVotes(user: address, height: uint256) -> uint256:
@@ -467,15 +775,15 @@ def getPriorVotes(user: address, height: uint256) -> uint256:
 
     uepoch: uint256 = self.epoch[user]
     uepoch = self.find_epoch_by_block(user, height, uepoch)
-    upoint: Point = self.point_history[user][uepoch]
+    upoint: Point = self._point_history(user, uepoch)
 
     max_epoch: uint256 = self.epoch[self]
     epoch: uint256 = self.find_epoch_by_block(self, height, max_epoch)
-    point_0: Point = self.point_history[self][epoch]
+    point_0: Point = self._point_history(self, epoch)
     d_block: uint256 = 0
     d_t: uint256 = 0
     if epoch < max_epoch:
-        point_1: Point = self.point_history[self][epoch + 1]
+        point_1: Point = self._point_history(self, epoch + 1)
         d_block = point_1.blk - point_0.blk
         d_t = point_1.ts - point_0.ts
     else:
@@ -499,6 +807,17 @@ def totalSupply(ts: uint256 = block.timestamp) -> uint256:
     return self._balanceOf(self, ts)
 
 
+@view
+@external
+def totalSupplyMany(timestamps: DynArray[uint256, MAX_BATCH]) -> DynArray[uint256, MAX_BATCH]:
+    """
+    @notice Calculate total voting power at several times
+    @param timestamps Epoch times to return voting power at, in ascending order
+    @return Total voting power at each time
+    """
+    return self._balances_at(self, timestamps)
+
+
 @view
 @external
 def totalSupplyAt(height: uint256) -> uint256:
@@ -511,10 +830,10 @@ def totalSupplyAt(height: uint256) -> uint256:
     epoch: uint256 = self.epoch[self]
     target_epoch: uint256 = self.find_epoch_by_block(self, height, epoch)
 
-    point: Point = self.point_history[self][target_epoch]
+    point: Point = self._point_history(self, target_epoch)
     dt: uint256 = 0
     if target_epoch < epoch:
-        point_next: Point = self.point_history[self][target_epoch + 1]
+        point_next: Point = self._point_history(self, target_epoch + 1)
         if point.blk != point_next.blk:
             dt = (height - point.blk) * (point_next.ts - point.ts) / (point_next.blk - point.blk)
     else:
@@ -0,0 +1,8 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.15;
+
+interface IDYfi {
+    function owner() external view returns (address);
+
+    function mint(address _to, uint256 _amount) external;
+}
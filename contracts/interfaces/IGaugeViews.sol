@@ -0,0 +1,25 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.15;
+
+/// @dev Gauge getters that are not part of IGauge.
+interface IGaugeViews {
+    function totalAssets() external view returns (uint256);
+
+    function rewardRate() external view returns (uint256);
+
+    function periodFinish() external view returns (uint256);
+
+    function queuedRewards() external view returns (uint256);
+
+    function rewardPerToken() external view returns (uint256);
+
+    function balanceOf(address _account) external view returns (uint256);
+
+    function boostedBalanceOf(address _account) external view returns (uint256);
+
+    function nextBoostedBalanceOf(
+        address _account
+    ) external view returns (uint256);
+
+    function earned(address _account) external view returns (uint256);
+}
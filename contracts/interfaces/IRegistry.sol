@@ -0,0 +1,10 @@
+// SPDX-License-Identifier: MIT
+pragma solidity 0.8.15;
+
+interface IRegistry {
+    function getVaults() external view returns (address[] memory);
+
+    function gauges(address _vault) external view returns (address);
+
+    function isGauge(address _gauge) external view returns (bool);
+}
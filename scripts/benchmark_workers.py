@@ -0,0 +1,32 @@
+import subprocess
+import time
+
+import click
+
+
+@click.group(short_help="Benchmark the test suite with parallel workers")
+def cli():
+    pass
+
+
+@cli.command()
+@click.option(
+    "--workers", default="1,2,4,8", help="Comma separated worker counts to time"
+)
+@click.argument("pytest_args", nargs=-1)
+def run(workers, pytest_args):
+    """
+    Time `ape test -n <workers>` for each worker count.
+    """
+    durations = {}
+    for count in [int(count) for count in workers.split(",")]:
+        start = time.perf_counter()
+        result = subprocess.run(["ape", "test", "-n", str(count), *pytest_args])
+        durations[count] = time.perf_counter() - start
+        if result.returncode != 0:
+            raise click.ClickException(f"tests failed with {count} workers")
+
+    baseline = next(iter(durations.values()))
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for count, duration in durations.items():
+        print(f"{count:>8} {duration:>9.1f} {baseline / duration:>7.2f}x")
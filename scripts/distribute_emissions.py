@@ -0,0 +1,49 @@
+import csv
+
+import click
+from ape import project
+from ape.cli import NetworkBoundCommand, account_option, network_option
+
+from veyfi.distributor import distribute
+
+
+@click.group(short_help="Distribute dYFI emissions to the gauges")
+def cli():
+    pass
+
+
+@cli.command(cls=NetworkBoundCommand)
+@network_option()
+@account_option()
+@click.option("--distributor", required=True, help="EmissionDistributor address")
+@click.option(
+    "--weights",
+    required=True,
+    type=click.Path(exists=True),
+    help="CSV file of gauge,weight rows",
+)
+def set_weights(network, account, distributor, weights):
+    distributor = project.EmissionDistributor.at(distributor)
+    with open(weights) as f:
+        rows = [row for row in csv.reader(f) if row]
+    gauges = [gauge for gauge, _ in rows]
+    distributor.setWeights(gauges, [int(weight) for _, weight in rows], sender=account)
+    print(f"set the weights of {len(gauges)} gauges")
+
+
+@cli.command(cls=NetworkBoundCommand)
+@network_option()
+@account_option()
+@click.option("--distributor", required=True, help="EmissionDistributor address")
+@click.option("--amount", type=int, help="dYFI to distribute in a new round")
+@click.option("--gas-budget", default=3_000_000, help="Gas limit per transaction")
+@click.option("--max-transactions", type=int, help="Stop after this many transactions")
+def run(network, account, distributor, amount, gas_budget, max_transactions):
+    distributor = project.EmissionDistributor.at(distributor)
+    receipts = distribute(distributor, account, gas_budget, amount, max_transactions)
+    for receipt in receipts:
+        print(f"{receipt.txn_hash} used {receipt.gas_used} gas")
+    print(
+        f"funded {distributor.cursor()} of {distributor.gaugeCount()} gauges "
+        f"with {distributor.roundDistributed()} of {distributor.roundAmount()} dYFI"
+    )
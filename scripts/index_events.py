@@ -0,0 +1,60 @@
+import time
+
+import click
+from ape.cli import NetworkBoundCommand, network_option
+
+from veyfi.indexer import Indexer
+
+
+@click.group(short_help="Index veYFI events")
+def cli():
+    pass
+
+
+@cli.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--db", default="veyfi.db", help="SQLite database to index into")
+@click.option("--ve-yfi", help="VotingYFI address")
+@click.option("--reward-pool", help="veYFI YFI RewardPool address")
+@click.option("--d-yfi-reward-pool", help="veYFI dYFIRewardPool address")
+@click.option("--gauge", multiple=True, help="Gauge address, can be repeated")
+@click.option("--start-block", default=0, help="First block for new contracts")
+@click.option("--stop-block", type=int, help="Last block to index, the head if unset")
+@click.option("--chunk-size", default=2000, help="Blocks fetched per eth_getLogs")
+@click.option("--confirmations", default=0, help="Blocks to stay behind the head")
+@click.option("--follow", is_flag=True, help="Keep indexing new blocks")
+@click.option(
+    "--poll-interval", default=12, help="Seconds between syncs in follow mode"
+)
+def index(
+    network,
+    db,
+    ve_yfi,
+    reward_pool,
+    d_yfi_reward_pool,
+    gauge,
+    start_block,
+    stop_block,
+    chunk_size,
+    confirmations,
+    follow,
+    poll_interval,
+):
+    indexer = Indexer(db)
+    contracts = [
+        (ve_yfi, "ve_yfi"),
+        (reward_pool, "reward_pool"),
+        (d_yfi_reward_pool, "d_yfi_reward_pool"),
+    ] + [(address, "gauge") for address in gauge]
+    for address, kind in contracts:
+        if address:
+            indexer.add_contract(address, kind, start_block)
+    if not indexer.contracts():
+        raise click.UsageError("no contract to index")
+
+    while True:
+        new_logs = indexer.sync(stop_block, chunk_size, confirmations)
+        print(f"indexed {new_logs} logs up to block {indexer.last_block()}")
+        if not follow or stop_block is not None:
+            break
+        time.sleep(poll_interval)
@@ -0,0 +1,58 @@
+import click
+from ape import project
+from ape.cli import NetworkBoundCommand, account_option, network_option
+
+from veyfi.indexer import Indexer
+from veyfi.keeper import kick, scan
+
+
+@click.group(short_help="Kick gauge stakers with a decayed boost")
+def cli():
+    pass
+
+
+@cli.command(cls=NetworkBoundCommand)
+@network_option()
+@account_option()
+@click.option("--ve-yfi", required=True, help="VotingYFI address")
+@click.option("--gauge", required=True, multiple=True, help="Gauge address")
+@click.option("--db", default="veyfi.db", help="SQLite database of the indexer")
+@click.option("--start-block", default=0, help="First block for new contracts")
+@click.option("--gas-budget", default=3_000_000, help="Gas limit per transaction")
+@click.option("--min-excess", default=1, help="Smallest boosted balance excess")
+@click.option("--max-transactions", type=int, help="Transactions per gauge")
+@click.option("--dry-run", is_flag=True, help="Only print the drifting stakers")
+def run(
+    network,
+    account,
+    ve_yfi,
+    gauge,
+    db,
+    start_block,
+    gas_budget,
+    min_excess,
+    max_transactions,
+    dry_run,
+):
+    ve_yfi = project.VotingYFI.at(ve_yfi)
+    gauges = [project.Gauge.at(address) for address in gauge]
+
+    indexer = Indexer(db)
+    indexer.add_contract(ve_yfi, "ve_yfi", start_block)
+    for gauge in gauges:
+        indexer.add_contract(gauge, "gauge", start_block)
+    indexer.sync()
+
+    for gauge in gauges:
+        drifts = scan(indexer, gauge, ve_yfi, min_excess=min_excess)
+        print(f"{gauge}: {len(drifts)} stakers above their boost")
+        for drift in drifts:
+            print(
+                f"  {drift.account} stored {drift.stored} current {drift.current} "
+                f"excess {drift.excess_rate}/s"
+            )
+        if dry_run or not drifts:
+            continue
+        receipts = kick(gauge, drifts, account, gas_budget, max_transactions)
+        for receipt in receipts:
+            print(f"  kicked in {receipt.txn_hash} using {receipt.gas_used} gas")
@@ -0,0 +1,66 @@
+import json
+
+import click
+from ape import accounts
+from ape.cli import NetworkBoundCommand, network_option
+
+from veyfi.load import LoadTest
+
+
+@click.group(short_help="Load test the veYFI system on a local network")
+def cli():
+    pass
+
+
+@cli.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--lockers", default=10_000, help="Lockers by the end of the ramp")
+@click.option("--gauges", default=100, help="Vault gauges in the registry")
+@click.option("--years", default=4, help="Simulated years")
+@click.option("--actions", default=50, help="Lock changes and withdrawals per week")
+@click.option("--claims", default=50, help="Lockers claiming each week")
+@click.option("--kicks", default=50, help="Stakers kicked each week")
+@click.option("--gas-budget", default=10_000_000, help="Gas per distribute call")
+@click.option("--seed", default=0, help="Seed of the random choices")
+@click.option("--output", type=click.Path(), help="JSON file of the results")
+def run(
+    network, lockers, gauges, years, actions, claims, kicks, gas_budget, seed, output
+):
+    load_test = LoadTest(
+        accounts.test_accounts[0],
+        lockers=lockers,
+        gauges=gauges,
+        weeks=years * 52,
+        actions_per_week=actions,
+        claims_per_week=claims,
+        kicks_per_week=kicks,
+        gas_budget=gas_budget,
+        seed=seed,
+    )
+    recorder = load_test.run()
+
+    print(
+        f"{'operation':<36} {'from week':>9} {'lockers':>7} {'count':>6} "
+        f"{'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"
+    )
+    for row in recorder.percentiles():
+        print(
+            f"{row['operation']:<36} {row['from_week']:>9} {row['population']:>7} "
+            f"{row['count']:>6} {row['p50']:>9} {row['p90']:>9} {row['p99']:>9} "
+            f"{row['max']:>9}"
+        )
+
+    flagged = {}
+    for flag in recorder.flags:
+        flagged.setdefault(flag.operation, []).append(flag)
+    for operation, flags in sorted(flagged.items()):
+        print(
+            f"{operation}: flagged {len(flags)} times from week {flags[0].week}, "
+            f"e.g. {flags[-1].reason}"
+        )
+    if not flagged:
+        print(f"nothing came within {recorder.ratio:.0%} of a limit")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(recorder.to_dict(), f, indent=2)
@@ -0,0 +1,44 @@
+import random
+
+import click
+from ape import chain, project
+from ape.cli import NetworkBoundCommand, network_option
+
+from veyfi.indexer import Indexer
+from veyfi.snapshot import snapshot, write_snapshot
+
+
+@click.group(short_help="Export veYFI voting power snapshots")
+def cli():
+    pass
+
+
+@cli.command(cls=NetworkBoundCommand)
+@network_option()
+@click.option("--ve-yfi", required=True, help="VotingYFI address")
+@click.option("--db", default="veyfi.db", help="SQLite database of the indexer")
+@click.option("--block", type=int, help="Block height, the head if unset")
+@click.option("--output", default="snapshot.csv", help="CSV or .parquet file")
+@click.option("--start-block", default=0, help="VotingYFI deployment block")
+@click.option("--sample", default=20, help="Holders to cross-check with the contract")
+def export(network, ve_yfi, db, block, output, start_block, sample):
+    ve_yfi = project.VotingYFI.at(ve_yfi)
+    height = chain.blocks.height if block is None else block
+
+    indexer = Indexer(db)
+    indexer.add_contract(ve_yfi, "ve_yfi", start_block)
+    indexer.sync()
+
+    balances = snapshot(indexer, ve_yfi, height)
+    write_snapshot(output, balances)
+    print(f"wrote {len(balances)} holders at block {height} to {output}")
+
+    mismatches = 0
+    for user in random.sample(list(balances), min(sample, len(balances))):
+        expected = ve_yfi.getPriorVotes(user, height)
+        if balances[user] != expected:
+            mismatches += 1
+            print(f"{user}: snapshot {balances[user]} != contract {expected}")
+    if mismatches:
+        raise click.ClickException(f"{mismatches} holders differ from the contract")
+    print(f"cross-checked {min(sample, len(balances))} holders with the contract")
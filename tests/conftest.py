@@ -1,20 +1,82 @@
+import json
+import os
+import time
+from pathlib import Path
+
 import pytest
+from ape import config as ape_config
 from ape import convert, chain
 from eth._utils.address import generate_contract_address
 from eth_utils import to_checksum_address, to_canonical_address
 
+from veyfi.profiler import format_functions, profile_transaction, write_folded
+
 DAY = 86400
 WEEK = 7 * DAY
 
+# `VEYFI_TEST_BACKEND=evm ape test` runs the suite on ape's in-process py-evm
+# provider instead of the foundry mainnet fork, without an RPC round trip per
+# call. Tests marked `fork` need mainnet state and are skipped there.
+TEST_BACKEND = os.environ.get("VEYFI_TEST_BACKEND", "foundry")
+IN_PROCESS_NETWORK = "ethereum:local:test"
+
+# With pytest-xdist (`ape test -n 4`), each worker starts its own anvil on
+# VEYFI_TEST_BASE_PORT + worker index. Accounts come from the same test mnemonic
+# on every node, and each worker deploys and aligns its own chain.
+BASE_PORT = int(os.environ.get("VEYFI_TEST_BASE_PORT", 8550))
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "fork: needs the mainnet fork")
+    config.addinivalue_line("markers", "gas: gas benchmark, run with --gas-bench")
+    config.addinivalue_line("markers", "slow: long simulation, run with --run-slow")
+    if TEST_BACKEND == "evm":
+        config.option.network = IN_PROCESS_NETWORK
+    elif TEST_BACKEND != "foundry":
+        raise pytest.UsageError(f"unknown VEYFI_TEST_BACKEND {TEST_BACKEND}")
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker is not None and TEST_BACKEND == "foundry":
+        port = BASE_PORT + int(worker.lstrip("gw"))
+        ape_config.get_config("foundry").host = f"http://127.0.0.1:{port}"
+
+
+def pytest_collection_modifyitems(config, items):
+    skip_fork = pytest.mark.skip(reason="needs the mainnet fork")
+    skip_gas = pytest.mark.skip(reason="gas benchmark, run with --gas-bench")
+    skip_slow = pytest.mark.skip(reason="long simulation, run with --run-slow")
+    gas_bench = config.getoption("gas_bench") or config.getoption("update_gas_baseline")
+    for item in items:
+        if TEST_BACKEND == "evm" and "fork" in item.keywords:
+            item.add_marker(skip_fork)
+        if not gas_bench and "gas" in item.keywords:
+            item.add_marker(skip_gas)
+        if not config.getoption("run_slow") and "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+# Deployments are session scoped: ape reverts the chain to the state right after
+# them at the end of every test.
+
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def start_week(chain):
+    """
+    Week boundary the functional tests start at, see `setup_time`, and the
+    reward pools a week later. It is at least a week after the session
+    deployments, so no deployment happens past it.
+    """
+    yield (chain.pending_timestamp // WEEK + 2) * WEEK
+
+
+@pytest.fixture(scope="session")
 def yfi(accounts, project):
     dev = accounts[0]
     yield project.Token.deploy("YFI", sender=dev)
 
 
-@pytest.fixture
-def ve_yfi_and_reward_pool(accounts, project, yfi):
+@pytest.fixture(scope="session")
+def ve_yfi_and_reward_pool(accounts, project, yfi, start_week):
     # calculate the reward pool address to pass to ve_yfi
     reward_pool_address = to_checksum_address(
         generate_contract_address(
@@ -23,29 +85,29 @@ def ve_yfi_and_reward_pool(accounts, project, yfi):
     )
     ve_yfi = project.VotingYFI.deploy(yfi, reward_pool_address, sender=accounts[0])
     start_time = (
-        chain.pending_timestamp + 7 * 3600 * 24
+        start_week + WEEK
     )  # MUST offset by a week otherwise token distributed are lost since no lock has been made yet.
     reward_pool = project.RewardPool.deploy(ve_yfi, start_time, sender=accounts[0])
     assert str(reward_pool) == reward_pool_address, "broken setup"
     yield ve_yfi, reward_pool
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def ve_yfi(ve_yfi_and_reward_pool):
     yield ve_yfi_and_reward_pool[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def reward_pool(ve_yfi_and_reward_pool):
     yield ve_yfi_and_reward_pool[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def d_yfi(accounts, project):
     yield project.dYFI.deploy(sender=accounts[0])
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def redemption(accounts, project, yfi, d_yfi, ve_yfi):
     oft = project.OracleFakeTime.deploy(sender=accounts[0])
 
@@ -60,7 +122,164 @@ def redemption(accounts, project, yfi, d_yfi, ve_yfi):
     )
 
 
-@pytest.fixture
-def ve_yfi_d_yfi_pool(accounts, project, ve_yfi, d_yfi):
-    start_time = chain.pending_timestamp + 7 * 3600 * 24
+@pytest.fixture(scope="session")
+def ve_yfi_d_yfi_pool(accounts, project, ve_yfi, d_yfi, start_week):
+    start_time = start_week + WEEK
     yield project.dYFIRewardPool.deploy(ve_yfi, d_yfi, start_time, sender=accounts[0])
+
+
+@pytest.fixture(scope="session")
+def time_travel(chain):
+    """
+    Mine `blocks` blocks `interval` seconds apart, split in `stages` equal
+    batches, and return the (block number, timestamp) of the head after each.
+    On anvil each batch is a single `anvil_mine` call instead of two calls per
+    block.
+    """
+
+    def time_travel(blocks, interval, stages=1):
+        assert blocks % stages == 0, "blocks must split evenly in stages"
+        heads = []
+        for _ in range(stages):
+            if chain.provider.name == "foundry":
+                chain.pending_timestamp += interval
+                chain.provider._make_request("anvil_mine", [blocks // stages, interval])
+                # anvil_mine also moves the next block an interval ahead
+                chain.pending_timestamp = chain.blocks.head.timestamp + 1
+            else:
+                for _ in range(blocks // stages):
+                    chain.pending_timestamp += interval
+                    chain.mine()
+            head = chain.blocks.head
+            heads.append((head.number, head.timestamp))
+        return heads
+
+    yield time_travel
+
+
+# `--gas-bench` runs the tests marked `gas` and compares the gas they record
+# with the baseline, `--update-gas-baseline` rewrites the baseline instead.
+GAS_BASELINE = Path(__file__).parent / "gas_baseline.json"
+_gas_used = {}
+
+
+@pytest.fixture(scope="session")
+def gas_profile(pytestconfig):
+    """
+    Profile the trace of a receipt by contract function and source line. With
+    `--gas-profile DIR`, also write it to DIR/<name>.folded for a flame graph and
+    the function table to DIR/<name>.txt.
+    """
+    directory = pytestconfig.getoption("gas_profile")
+    if directory:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    def gas_profile(name, receipt):
+        profile = profile_transaction(receipt)
+        if directory:
+            write_folded(profile, Path(directory) / f"{name}.folded")
+            (Path(directory) / f"{name}.txt").write_text(
+                format_functions(profile) + "\n"
+            )
+        return profile
+
+    yield gas_profile
+
+
+@pytest.fixture(scope="session")
+def gas_benchmark(pytestconfig, gas_profile):
+    """
+    Record the gas used by a receipt under a name and fail if it is more than
+    `--gas-tolerance` above the baseline, or if the baseline has no entry for
+    it. Receipts are profiled too with `--gas-profile`.
+    """
+    baseline = json.loads(GAS_BASELINE.read_text()) if GAS_BASELINE.exists() else {}
+    update = pytestconfig.getoption("update_gas_baseline")
+    tolerance = pytestconfig.getoption("gas_tolerance")
+    profiling = pytestconfig.getoption("gas_profile")
+
+    def record(name, receipt):
+        gas_used = receipt.gas_used
+        _gas_used[name] = gas_used
+        if profiling:
+            gas_profile(name, receipt)
+        if update:
+            return gas_used
+        assert name in baseline, (
+            f"{name} used {gas_used} gas and has no baseline, "
+            "run the benchmarks with --update-gas-baseline"
+        )
+        limit = int(baseline[name] * (1 + tolerance))
+        assert (
+            gas_used <= limit
+        ), f"{name} used {gas_used} gas, baseline {baseline[name]} (limit {limit})"
+        return gas_used
+
+    yield record
+
+    if update and _gas_used:
+        baseline.update(_gas_used)
+        GAS_BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+# `--setup-report` prints the time spent setting up the fixtures of each test.
+_setup_durations = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--setup-report",
+        action="store_true",
+        help="Report the fixture setup time of each test.",
+    )
+    parser.addoption(
+        "--gas-bench",
+        action="store_true",
+        help="Run the gas benchmarks against tests/gas_baseline.json.",
+    )
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        help="Write the gas used by the benchmarks to tests/gas_baseline.json.",
+    )
+    parser.addoption(
+        "--gas-tolerance",
+        type=float,
+        default=0.02,
+        help="Relative gas increase over the baseline that fails a benchmark.",
+    )
+    parser.addoption(
+        "--run-slow",
+        action="store_true",
+        help="Run the tests marked slow, such as the load test smoke run.",
+    )
+    parser.addoption(
+        "--gas-profile",
+        metavar="DIR",
+        help="Write the opcode gas profile of the benchmarked transactions to DIR.",
+    )
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    start = time.perf_counter()
+    yield
+    _setup_durations[item.nodeid] = time.perf_counter() - start
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if _gas_used:
+        terminalreporter.write_sep("=", "gas used")
+        for name, gas_used in sorted(_gas_used.items()):
+            terminalreporter.write_line(f"{gas_used:>10} {name}")
+    if not config.getoption("setup_report") or not _setup_durations:
+        return
+    total = sum(_setup_durations.values())
+    terminalreporter.write_sep("=", "fixture setup time")
+    terminalreporter.write_line(
+        f"{total:.2f}s for {len(_setup_durations)} tests, "
+        f"{total / len(_setup_durations):.3f}s per test"
+    )
+    slowest = sorted(_setup_durations.items(), key=lambda item: item[1], reverse=True)
+    for nodeid, duration in slowest[:10]:
+        terminalreporter.write_line(f"{duration:.3f}s {nodeid}")
@@ -1,53 +1,69 @@
+from types import SimpleNamespace
+
 import pytest
+from ape import chain
 
 DAY = 86400
 WEEK = 7 * DAY
 
 
 @pytest.fixture
+def setup_time(chain, start_week):
+    """
+    Start the test at the `start_week` boundary, a week before the reward
+    pools start. Modules on the session deployments use it through
+    `pytestmark`, so each test sees the same clock whatever ran before it.
+    """
+    # ape's isolation reverts this block unless its snapshot was taken after it
+    if chain.blocks.head.timestamp != start_week:
+        chain.pending_timestamp = start_week
+        chain.mine()
+
+
+@pytest.fixture(scope="session")
 def gov(accounts):
     yield accounts[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def whale(accounts):
     a = accounts[1]
     yield a
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def shark(accounts):
     a = accounts[2]
     yield a
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def fish(accounts):
     a = accounts[3]
     yield a
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def panda(accounts):
     yield accounts[4]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def doggie(accounts):
     yield accounts[5]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def bunny(accounts):
     yield accounts[6]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def yfi(project, gov):
     yield gov.deploy(project.Token, "YFI")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def create_token(project, gov):
     def create_token(name):
         return gov.deploy(project.Token, name)
@@ -55,24 +71,24 @@ def create_token(project, gov):
     yield create_token
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def ve_yfi_rewards(ve_yfi_and_reward_pool):
     (_, ve_yfi_rewards) = ve_yfi_and_reward_pool
     yield ve_yfi_rewards
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def gauge_factory(project, gov, ve_yfi, d_yfi, ve_yfi_d_yfi_pool):
     gauge = gov.deploy(project.Gauge, ve_yfi, d_yfi, ve_yfi_d_yfi_pool)
     yield gov.deploy(project.GaugeFactory, gauge)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def registry(project, gov, ve_yfi, yfi, gauge_factory, ve_yfi_rewards):
     yield gov.deploy(project.Registry, ve_yfi, yfi, gauge_factory, ve_yfi_rewards)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def create_vault(project, gov):
     def create_vault():
         return gov.deploy(project.Token, "Yearn vault")
@@ -80,7 +96,7 @@ def create_vault(project, gov):
     yield create_vault
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def create_gauge(registry, gauge_factory, gov, project):
     def create_gauge(vault):
         tx = registry.addVaultToRewards(vault, gov, sender=gov)
@@ -88,3 +104,27 @@ def create_gauge(registry, gauge_factory, gov, project):
         return project.Gauge.at(gauge_address)
 
     yield create_gauge
+
+
+@pytest.fixture
+def world(yfi, ve_yfi, whale, shark, fish):
+    """
+    Whale, shark and fish locks on top of the session deployment. They are
+    created for each test that requests them and reverted with the rest of
+    the test, so other tests never see them.
+    """
+    locks = {
+        whale: (10**22, 4 * 365 * DAY),
+        shark: (10**20, 2 * 365 * DAY),
+        fish: (10**18, 365 * DAY),
+    }
+    for user, (amount, duration) in locks.items():
+        yfi.mint(user, amount, sender=user)
+        yfi.approve(ve_yfi, amount, sender=user)
+        ve_yfi.modify_lock(amount, chain.pending_timestamp + duration, sender=user)
+    yield SimpleNamespace(
+        whale=whale,
+        shark=shark,
+        fish=fish,
+        amounts={user: amount for user, (amount, _) in locks.items()},
+    )
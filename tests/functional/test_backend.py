@@ -0,0 +1,10 @@
+import os
+
+
+def test_backend_selects_the_provider(networks):
+    # `config.option.network` set in pytest_configure overrides ape-config.yaml
+    if os.environ.get("VEYFI_TEST_BACKEND", "foundry") == "evm":
+        assert networks.provider.name == "test"
+        assert networks.provider.network.name == "local"
+    else:
+        assert networks.provider.name == "foundry"
@@ -0,0 +1,62 @@
+import ape
+import pytest
+from ape import chain, project
+
+from veyfi.distributor import distribute
+
+DAY = 86400
+WEEK = 7 * DAY
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+@pytest.fixture
+def distributor(gov, d_yfi, registry):
+    yield gov.deploy(project.EmissionDistributor, d_yfi, registry)
+
+
+def test_distribute_in_pages(distributor, create_vault, create_gauge, d_yfi, gov):
+    gauges = [create_gauge(create_vault()) for _ in range(5)]
+    weights = [1, 2, 3, 4, 5]
+    distributor.setWeights(gauges, weights, sender=gov)
+
+    amount = 10**18 + 7
+    d_yfi.mint(gov, amount, sender=gov)
+    d_yfi.approve(distributor, amount, sender=gov)
+    distributor.startRound(amount, sender=gov)
+    with ape.reverts("round in progress"):
+        distributor.startRound(amount, sender=gov)
+
+    distributor.distribute(2, sender=gov)
+    assert distributor.cursor() == 2
+    assert distributor.roundInProgress()
+    distributor.distribute(10, sender=gov)
+    assert distributor.cursor() == 5
+    assert not distributor.roundInProgress()
+    # the cursor never goes back, so gauges can't be funded twice
+    distributor.distribute(10, sender=gov)
+    assert sum(d_yfi.balanceOf(gauge) for gauge in gauges) == amount
+
+    for gauge, weight in zip(gauges[:-1], weights):
+        assert d_yfi.balanceOf(gauge) == amount * weight // sum(weights)
+    assert sum(d_yfi.balanceOf(gauge) for gauge in gauges) == amount
+    assert d_yfi.balanceOf(distributor) == 0
+
+
+def test_distribute_gas_per_gauge(distributor, create_vault, create_gauge, d_yfi, gov):
+    gauges = [create_gauge(create_vault()) for _ in range(12)]
+    distributor.setWeights(gauges, [1] * len(gauges), sender=gov)
+    # the distributor mints when it owns dYFI
+    d_yfi.transferOwnership(distributor, sender=gov)
+
+    gas_budget = 400_000
+    receipts = distribute(distributor, gov, gas_budget, amount=12 * 10**18)
+    assert d_yfi.balanceOf(distributor) == 0
+    assert all(d_yfi.balanceOf(gauge) == 10**18 for gauge in gauges)
+    pages = receipts[1:]
+    assert len(pages) > 1
+    assert all(receipt.gas_used <= gas_budget for receipt in pages)
+
+    # funding a gauge writes its first reward period and dYFI balance
+    gas_per_gauge = sum(r.gas_used for r in pages) / len(gauges)
+    assert gas_per_gauge < 200_000
@@ -0,0 +1,142 @@
+from itertools import product
+from types import SimpleNamespace
+
+import pytest
+from ape import chain
+
+DAY = 86400
+WEEK = 7 * DAY
+LOCK = 10**18
+LP_AMOUNT = 10**18
+REWARDS = 10**20
+
+# (weeks elapsed before the call, epochs of the caller, veYFI holders)
+GRID = list(product([0, 1, 26], [1, 10], [1, 8]))
+GRID_IDS = ["w{}-e{}-h{}".format(*params) for params in GRID]
+
+pytestmark = [pytest.mark.gas, pytest.mark.usefixtures("setup_time")]
+
+
+@pytest.fixture(params=GRID, ids=GRID_IDS)
+def holders(request, accounts, yfi, ve_yfi):
+    """
+    Lock YFI for `holders` accounts, the first of which, the caller of the
+    benchmarked function, extends its lock until it has `epochs` epochs.
+    """
+    weeks, epochs, count = request.param
+    users = accounts[1 : 1 + count]
+    for user in users:
+        yfi.mint(user, LOCK * (epochs + 1), sender=user)
+        yfi.approve(ve_yfi, LOCK * (epochs + 1), sender=user)
+        ve_yfi.modify_lock(LOCK, chain.pending_timestamp + 2 * 365 * DAY, sender=user)
+    for _ in range(epochs - 1):
+        ve_yfi.modify_lock(LOCK, 0, sender=users[0])
+    yield SimpleNamespace(
+        user=users[0], users=users, weeks=weeks, id=GRID_IDS[request.param_index]
+    )
+
+
+def elapse(weeks):
+    if weeks:
+        chain.pending_timestamp += weeks * WEEK
+        chain.mine()
+
+
+@pytest.fixture
+def staked_gauge(create_vault, create_gauge, d_yfi, gov, holders):
+    vault = create_vault()
+    gauge = create_gauge(vault)
+    for user in holders.users:
+        vault.mint(user, 2 * LP_AMOUNT, sender=user)
+        vault.approve(gauge, 2 * LP_AMOUNT, sender=user)
+        gauge.deposit(LP_AMOUNT, sender=user)
+    d_yfi.mint(gov, REWARDS, sender=gov)
+    d_yfi.approve(gauge, REWARDS, sender=gov)
+    gauge.queueNewRewards(REWARDS, sender=gov)
+    yield gauge
+
+
+def test_modify_lock(ve_yfi, holders, gas_benchmark):
+    elapse(holders.weeks)
+    tx = ve_yfi.modify_lock(LOCK, 0, sender=holders.user)
+    gas_benchmark(f"VotingYFI.modify_lock[{holders.id}]", tx)
+
+
+def test_withdraw(ve_yfi, holders, gas_benchmark):
+    elapse(holders.weeks)
+    tx = ve_yfi.withdraw(sender=holders.user)
+    gas_benchmark(f"VotingYFI.withdraw[{holders.id}]", tx)
+
+
+def test_checkpoint(ve_yfi, gov, holders, gas_benchmark):
+    elapse(holders.weeks)
+    tx = ve_yfi.checkpoint(sender=gov)
+    gas_benchmark(f"VotingYFI.checkpoint[{holders.id}]", tx)
+
+
+def test_reward_pool_claim(yfi, ve_yfi_rewards, gov, holders, gas_benchmark):
+    yfi.mint(gov, REWARDS, sender=gov)
+    yfi.approve(ve_yfi_rewards, REWARDS, sender=gov)
+    ve_yfi_rewards.burn(sender=gov)
+    elapse(holders.weeks)
+    tx = ve_yfi_rewards.claim(sender=holders.user)
+    gas_benchmark(f"RewardPool.claim[{holders.id}]", tx)
+
+
+def test_d_yfi_reward_pool_claim(d_yfi, ve_yfi_d_yfi_pool, gov, holders, gas_benchmark):
+    d_yfi.mint(gov, REWARDS, sender=gov)
+    d_yfi.approve(ve_yfi_d_yfi_pool, REWARDS, sender=gov)
+    ve_yfi_d_yfi_pool.burn(sender=gov)
+    elapse(holders.weeks)
+    tx = ve_yfi_d_yfi_pool.claim(sender=holders.user)
+    gas_benchmark(f"dYFIRewardPool.claim[{holders.id}]", tx)
+
+
+def test_checkpoint_total_supply(ve_yfi_rewards, gov, holders, gas_benchmark):
+    elapse(holders.weeks)
+    tx = ve_yfi_rewards.checkpoint_total_supply(sender=gov)
+    gas_benchmark(f"RewardPool.checkpoint_total_supply[{holders.id}]", tx)
+
+
+def test_gauge_deposit(staked_gauge, holders, gas_benchmark):
+    elapse(holders.weeks)
+    tx = staked_gauge.deposit(LP_AMOUNT, sender=holders.user)
+    gas_benchmark(f"Gauge.deposit[{holders.id}]", tx)
+
+
+def test_gauge_withdraw(staked_gauge, holders, gas_benchmark):
+    elapse(holders.weeks)
+    user = holders.user
+    tx = staked_gauge.withdraw(LP_AMOUNT // 2, user, user, False, sender=user)
+    gas_benchmark(f"Gauge.withdraw[{holders.id}]", tx)
+
+
+def test_gauge_get_reward(staked_gauge, holders, gas_benchmark):
+    elapse(holders.weeks)
+    tx = staked_gauge.getReward(sender=holders.user)
+    gas_benchmark(f"Gauge.getReward[{holders.id}]", tx)
+
+
+def test_gauge_kick(staked_gauge, gov, holders, gas_benchmark):
+    elapse(holders.weeks)
+    tx = staked_gauge.kick(holders.users, sender=gov)
+    gas_benchmark(f"Gauge.kick[{holders.id}]", tx)
+
+
+@pytest.mark.fork
+def test_redeem(yfi, d_yfi, redemption, gov, holders, gas_benchmark):
+    yfi.mint(redemption, LOCK, sender=gov)
+    d_yfi.mint(holders.user, LOCK, sender=gov)
+    d_yfi.approve(redemption, LOCK, sender=holders.user)
+    elapse(holders.weeks)
+    tx = redemption.redeem(
+        LOCK, sender=holders.user, value=redemption.eth_required(LOCK)
+    )
+    gas_benchmark(f"Redemption.redeem[{holders.id}]", tx)
+
+
+def test_create_gauge(create_vault, gauge_factory, gov, holders, gas_benchmark):
+    vault = create_vault()
+    elapse(holders.weeks)
+    tx = gauge_factory.createGauge(vault, gov, sender=gov)
+    gas_benchmark(f"GaugeFactory.createGauge[{holders.id}]", tx)
@@ -7,13 +7,7 @@ ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 DAY = 86400
 WEEK = 7 * DAY
 
-
-@pytest.fixture(autouse=True)
-def setup_time(chain):
-    chain.pending_timestamp += WEEK - (
-        chain.pending_timestamp - (chain.pending_timestamp // WEEK * WEEK)
-    )
-    chain.mine()
+pytestmark = pytest.mark.usefixtures("setup_time")
 
 
 def test_set_gov(create_vault, create_gauge, panda, gov):
@@ -92,3 +86,89 @@ def test_set_duration(create_vault, create_gauge, d_yfi, gov):
     assert gauge.duration() == 28 * 3600 * 24
     assert gauge.periodFinish() != finish
     assert pytest.approx(gauge.periodFinish()) == time + 28 * 3600 * 24
+
+
+def test_gauge_lens(
+    create_vault, create_gauge, registry, yfi, ve_yfi, d_yfi, whale, gov
+):
+    lens = gov.deploy(project.GaugeLens)
+    yfi.mint(whale, 10**18, sender=whale)
+    yfi.approve(ve_yfi, 10**18, sender=whale)
+    ve_yfi.modify_lock(10**18, chain.pending_timestamp + 365 * DAY, sender=whale)
+
+    gauges = [create_gauge(create_vault()) for _ in range(3)]
+    for gauge in gauges[:2]:
+        vault = project.Token.at(gauge.asset())
+        vault.mint(whale, 10**18, sender=gov)
+        vault.approve(gauge, 10**18, sender=whale)
+        gauge.deposit(sender=whale)
+    d_yfi.mint(gov, 10**18, sender=gov)
+    d_yfi.approve(gauges[0], 10**18, sender=gov)
+    gauges[0].queueNewRewards(10**18, sender=gov)
+    chain.mine(timestamp=chain.pending_timestamp + DAY)
+
+    assert lens.gaugeCount(registry) == 3
+    stats = lens.getGaugeStats(registry, 0, 10)
+    assert [s.gauge for s in stats] == gauges
+    assert [s.vault for s in stats] == registry.getVaults()
+    for s, gauge in zip(stats, gauges):
+        assert s.totalAssets == gauge.totalAssets()
+        assert s.rewardRate == gauge.rewardRate()
+        assert s.periodFinish == gauge.periodFinish()
+        assert s.queuedRewards == gauge.queuedRewards()
+        assert s.rewardPerToken == gauge.rewardPerToken()
+    assert [s.gauge for s in lens.getGaugeStats(registry, 1, 1)] == gauges[1:2]
+    assert len(lens.getGaugeStats(registry, 3, 10)) == 0
+
+    positions = lens.getPositions(registry, whale, 0, 2**256 - 1)
+    assert [p.gauge for p in positions] == gauges
+    for p, gauge in zip(positions, gauges):
+        assert p.balance == gauge.balanceOf(whale)
+        assert p.boostedBalance == gauge.boostedBalanceOf(whale)
+        assert p.nextBoostedBalance == gauge.nextBoostedBalanceOf(whale)
+        assert p.earned == gauge.earned(whale)
+    assert positions[0].earned > 0
+    assert positions[2].balance == 0
+
+
+def test_gauge_router(
+    create_vault, create_gauge, registry, yfi, ve_yfi, d_yfi, whale, shark, gov
+):
+    router = gov.deploy(project.GaugeRouter, registry)
+    yfi.mint(whale, 10**18, sender=whale)
+    yfi.approve(ve_yfi, 10**18, sender=whale)
+    ve_yfi.modify_lock(10**18, chain.pending_timestamp + 4 * 365 * DAY, sender=whale)
+
+    gauges = [create_gauge(create_vault()) for _ in range(3)]
+    amounts = [10**18, 2 * 10**18, 3 * 10**18]
+    for gauge, amount in zip(gauges, amounts):
+        vault = project.Token.at(gauge.asset())
+        vault.mint(whale, amount, sender=gov)
+        vault.approve(router, amount, sender=whale)
+    router.deposit(gauges, amounts, False, sender=whale)
+    for gauge, amount in zip(gauges, amounts):
+        assert gauge.balanceOf(whale) == amount
+        assert gauge.boostedBalanceOf(whale) == amount
+
+    for gauge in gauges:
+        d_yfi.mint(gov, 10**18, sender=gov)
+        d_yfi.approve(gauge, 10**18, sender=gov)
+        gauge.queueNewRewards(10**18, sender=gov)
+    gauges[1].setRecipient(shark, sender=whale)
+    chain.pending_timestamp += DAY
+
+    router.claim(gauges, sender=whale)
+    assert d_yfi.balanceOf(whale) > 0
+    assert d_yfi.balanceOf(shark) > 0
+    for gauge in gauges:
+        assert gauge.rewards(whale) == 0
+
+    with ape.reverts("!gauge"):
+        router.claim([gauges[0], create_vault()], sender=whale)
+
+    for gauge in gauges:
+        gauge.approve(router, 2**256 - 1, sender=whale)
+    router.withdraw(gauges, [10**18, 2**256 - 1, 2**256 - 1], True, sender=whale)
+    for gauge, amount in zip(gauges, amounts):
+        assert gauge.balanceOf(whale) == 0
+        assert project.Token.at(gauge.asset()).balanceOf(whale) == amount
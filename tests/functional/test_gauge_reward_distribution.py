@@ -3,16 +3,11 @@ import pytest
 from ape import chain, project
 from eth_utils import to_int
 
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 DAY = 86400
 WEEK = 7 * DAY
 
-
-@pytest.fixture(autouse=True)
-def setup_time(chain):
-    chain.pending_timestamp += WEEK - (
-        chain.pending_timestamp - (chain.pending_timestamp // WEEK * WEEK)
-    )
-    chain.mine()
+pytestmark = pytest.mark.usefixtures("setup_time")
 
 
 def test_gauge_yfi_distribution_full_rewards(
@@ -429,3 +424,128 @@ def transfer(
     ) == d_yfi_to_distribute / (14 * 24)
     assert d_yfi.balanceOf(ve_yfi_d_yfi_pool) == 0
     assert gauge.queuedRewards() == 0
+
+
+def test_gauge_penalties_are_forwarded_by_default(
+    yfi, d_yfi, ve_yfi, panda, create_vault, create_gauge, gov, ve_yfi_d_yfi_pool
+):
+    yfi.mint(gov, 10**18, sender=gov)
+    yfi.approve(ve_yfi, 10**18, sender=gov)
+    ve_yfi.modify_lock(
+        10**18, chain.pending_timestamp + 4 * 3600 * 24 * 365, sender=gov
+    )
+
+    lp_amount = 10**18
+    vault = create_vault()
+    gauge = create_gauge(vault)
+    assert gauge.penaltyFlushInterval() == 0
+
+    # gov holds all the veYFI and earns without a penalty, panda has no boost
+    for user in [gov, panda]:
+        vault.mint(user, lp_amount, sender=gov)
+        vault.approve(gauge, lp_amount, sender=user)
+        gauge.deposit(sender=user)
+
+    d_yfi_to_distribute = 10**16
+    d_yfi.mint(gov, d_yfi_to_distribute, sender=gov)
+    d_yfi.approve(gauge, d_yfi_to_distribute, sender=gov)
+    gauge.queueNewRewards(d_yfi_to_distribute, sender=gov)
+
+    forwarded = 0
+    for _ in range(2):
+        chain.pending_timestamp += 3600
+        tx = gauge.getReward(sender=panda)
+        [accrued] = tx.decode_logs(gauge.PenaltyAccrued)
+        [flushed] = tx.decode_logs(gauge.PenaltyFlushed)
+        [transferred] = tx.decode_logs(gauge.TransferredPenalty)
+        assert accrued.account == transferred.account == panda
+        assert accrued.amount == flushed.amount == transferred.transfered > 0
+        forwarded += flushed.amount
+        assert gauge.pendingPenalty() == 0
+        assert d_yfi.balanceOf(ve_yfi_d_yfi_pool) == forwarded
+
+    tx = gauge.getReward(sender=gov)
+    assert d_yfi.balanceOf(gov) > 0
+    assert tx.decode_logs(gauge.PenaltyAccrued) == []
+    assert tx.decode_logs(gauge.PenaltyFlushed) == []
+    assert tx.decode_logs(gauge.TransferredPenalty) == []
+
+
+def test_gauge_penalties_are_flushed_in_batches(
+    yfi, d_yfi, ve_yfi, panda, create_vault, create_gauge, gov, ve_yfi_d_yfi_pool
+):
+    yfi.mint(gov, 10**18, sender=gov)
+    yfi.approve(ve_yfi, 10**18, sender=gov)
+    ve_yfi.modify_lock(
+        10**18, chain.pending_timestamp + 4 * 3600 * 24 * 365, sender=gov
+    )
+
+    lp_amount = 10**18
+    vault = create_vault()
+    gauge = create_gauge(vault)
+    interval = 24 * 3600
+    gauge.setPenaltyFlushInterval(interval, sender=gov)
+    assert gauge.penaltyFlushInterval() == interval
+
+    vault.mint(panda, lp_amount, sender=gov)
+    vault.approve(gauge, lp_amount, sender=panda)
+    gauge.deposit(sender=panda)
+
+    d_yfi_to_distribute = 10**16
+    d_yfi.mint(gov, d_yfi_to_distribute, sender=gov)
+    d_yfi.approve(gauge, d_yfi_to_distribute, sender=gov)
+    gauge.queueNewRewards(d_yfi_to_distribute, sender=gov)
+
+    # the first penalty is transferred right away
+    chain.pending_timestamp += 3600
+    gauge.getReward(sender=panda)
+    flushed = d_yfi.balanceOf(ve_yfi_d_yfi_pool)
+    assert flushed > 0
+    assert gauge.pendingPenalty() == 0
+
+    # later penalties accumulate in the gauge until the flush interval is over
+    chain.pending_timestamp += 3600
+    tx = gauge.getReward(sender=panda)
+    pending = gauge.pendingPenalty()
+    assert pending > 0
+    assert tx.decode_logs(gauge.PenaltyAccrued)[0].amount == pending
+    assert tx.decode_logs(gauge.PenaltyFlushed) == []
+    assert tx.decode_logs(gauge.TransferredPenalty) == []
+    assert d_yfi.balanceOf(ve_yfi_d_yfi_pool) == flushed
+
+    tx = gauge.flushPenalties(sender=panda)
+    assert tx.return_value == pending
+    [transferred] = tx.decode_logs(gauge.TransferredPenalty)
+    assert transferred.account == ZERO_ADDRESS
+    assert transferred.transfered == pending
+    assert gauge.pendingPenalty() == 0
+    assert d_yfi.balanceOf(ve_yfi_d_yfi_pool) == flushed + pending
+
+    chain.pending_timestamp += 3600
+    gauge.getReward(sender=panda)
+    assert gauge.pendingPenalty() > 0
+
+    chain.pending_timestamp += interval
+    gauge.getReward(sender=panda)
+    assert gauge.pendingPenalty() == 0
+    assert pytest.approx(
+        d_yfi.balanceOf(ve_yfi_d_yfi_pool) + d_yfi.balanceOf(panda), rel=10e-4
+    ) == d_yfi_to_distribute * (4 * 3600 + interval) // (14 * 24 * 3600)
+
+    # back to forwarding every penalty
+    gauge.setPenaltyFlushInterval(0, sender=gov)
+    chain.pending_timestamp += 3600
+    gauge.getReward(sender=panda)
+    assert gauge.pendingPenalty() == 0
+
+
+def test_gauge_penalty_flush_interval_is_bounded(
+    create_vault, create_gauge, gov, panda
+):
+    gauge = create_gauge(create_vault())
+    with ape.reverts("Ownable: caller is not the owner"):
+        gauge.setPenaltyFlushInterval(3600, sender=panda)
+    with ape.reverts("interval too long"):
+        gauge.setPenaltyFlushInterval(
+            gauge.MAX_PENALTY_FLUSH_INTERVAL() + 1, sender=gov
+        )
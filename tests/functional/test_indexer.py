@@ -0,0 +1,40 @@
+import pytest
+from ape import chain
+
+from veyfi.indexer import Indexer
+
+DAY = 86400
+WEEK = 7 * DAY
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+def test_index_locks_and_resume(tmp_path, yfi, ve_yfi, whale, shark):
+    db = str(tmp_path / "veyfi.db")
+    start_block = chain.blocks.head.number
+    amount = 10**21
+    for user in (whale, shark):
+        yfi.mint(user, 2 * amount, sender=user)
+        yfi.approve(ve_yfi, 2 * amount, sender=user)
+        ve_yfi.modify_lock(amount, chain.pending_timestamp + 2 * 365 * DAY, sender=user)
+
+    indexer = Indexer(db)
+    indexer.add_contract(ve_yfi, "ve_yfi", start_block)
+    assert indexer.sync(chunk_size=2) == 4
+    assert indexer.last_block() == chain.blocks.head.number
+
+    # a new indexer resumes from the last indexed block
+    ve_yfi.modify_lock(amount, 0, sender=whale)
+    chain.pending_timestamp += 30 * DAY
+    ve_yfi.withdraw(sender=shark)
+    indexer = Indexer(db)
+    assert indexer.sync() == 5
+    assert indexer.sync() == 0
+    assert indexer.count_logs("Penalty") == 1
+
+    for user in (whale, shark):
+        lock = indexer.lock(ve_yfi, user)
+        assert lock["amount"] == ve_yfi.locked(user).amount
+        assert lock["end"] == ve_yfi.locked(user).end
+        assert lock["epoch"] == ve_yfi.epoch(user)
+    assert indexer.lock(ve_yfi, shark)["penalty"] > 0
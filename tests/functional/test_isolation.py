@@ -0,0 +1,41 @@
+import pytest
+from ape import chain
+
+DAY = 86400
+WEEK = 7 * DAY
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+def test_world_locks(world, ve_yfi):
+    for user, amount in world.amounts.items():
+        assert ve_yfi.locked(user).amount == amount
+    assert (
+        ve_yfi.balanceOf(world.whale)
+        > ve_yfi.balanceOf(world.shark)
+        > ve_yfi.balanceOf(world.fish)
+        > 0
+    )
+    assert ve_yfi.totalSupply() == sum(ve_yfi.balanceOf(user) for user in world.amounts)
+
+
+def test_world_is_only_seen_by_the_tests_requesting_it(ve_yfi, whale, shark, fish):
+    for user in [whale, shark, fish]:
+        assert ve_yfi.locked(user).amount == 0
+    assert ve_yfi.totalSupply() == 0
+
+
+def test_world_withdraw(world, yfi, ve_yfi):
+    chain.pending_timestamp += 400 * DAY
+    ve_yfi.withdraw(sender=world.fish)
+    assert yfi.balanceOf(world.fish) == world.amounts[world.fish]
+
+
+def test_world_is_reverted_after_each_test(world, ve_yfi, start_week):
+    assert chain.pending_timestamp // WEEK * WEEK == start_week
+    assert ve_yfi.locked(world.fish).amount == world.amounts[world.fish]
+
+
+def test_tests_start_at_the_same_boundary(start_week):
+    # whatever ran before, including the 400 days of test_world_withdraw
+    assert chain.blocks.head.timestamp == start_week
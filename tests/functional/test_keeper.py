@@ -0,0 +1,58 @@
+import pytest
+from ape import chain
+
+from veyfi.indexer import Indexer
+from veyfi.keeper import kick, scan
+
+DAY = 86400
+WEEK = 7 * DAY
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+def test_kick_decayed_boosts(
+    tmp_path, accounts, yfi, d_yfi, ve_yfi, gov, create_vault, create_gauge
+):
+    start_block = chain.blocks.head.number
+    yfi.mint(gov, 10**18, sender=gov)
+    yfi.approve(ve_yfi, 10**18, sender=gov)
+    ve_yfi.modify_lock(10**18, chain.pending_timestamp + 4 * 365 * DAY, sender=gov)
+    vault = create_vault()
+    gauge = create_gauge(vault)
+    stakers = accounts[1:8]
+    for i, staker in enumerate(stakers):
+        amount = 10**18 * (i + 1)
+        yfi.mint(staker, amount, sender=staker)
+        yfi.approve(ve_yfi, amount, sender=staker)
+        ve_yfi.modify_lock(
+            amount, chain.pending_timestamp + (i + 1) * WEEK, sender=staker
+        )
+        vault.mint(staker, 10**18, sender=gov)
+        vault.approve(gauge, 10**18, sender=staker)
+        gauge.deposit(sender=staker)
+
+    d_yfi.mint(gov, 10**18, sender=gov)
+    d_yfi.approve(gauge, 10**18, sender=gov)
+    gauge.queueNewRewards(10**18, sender=gov)
+    # every staker lock expires
+    chain.pending_timestamp += 10 * WEEK
+    chain.mine()
+
+    indexer = Indexer(str(tmp_path / "veyfi.db"))
+    indexer.add_contract(ve_yfi, "ve_yfi", start_block)
+    indexer.add_contract(gauge, "gauge", start_block)
+    indexer.sync()
+    drifts = scan(indexer, gauge, ve_yfi, ts=chain.blocks.head.timestamp)
+    assert len(drifts) == len(stakers)
+    for drift in drifts:
+        assert drift.stored == gauge.boostedBalanceOf(drift.account)
+        assert drift.current == gauge.nextBoostedBalanceOf(drift.account)
+    assert drifts == sorted(drifts, key=lambda drift: drift.excess_rate, reverse=True)
+
+    gas_budget = 200_000
+    receipts = kick(gauge, drifts, gov, gas_budget)
+    assert len(receipts) > 1
+    assert all(receipt.gas_used <= gas_budget for receipt in receipts)
+
+    indexer.sync()
+    assert scan(indexer, gauge, ve_yfi, ts=chain.blocks.head.timestamp) == []
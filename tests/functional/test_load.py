@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from veyfi.load import GasRecorder, LoadTest
+
+
+def test_gas_recorder_flags_limits():
+    recorder = GasRecorder(30_000_000, ratio=0.8)
+    recorder.record("small", SimpleNamespace(gas_used=100_000), 0, 1)
+    recorder.record("large", SimpleNamespace(gas_used=25_000_000), 53, 2)
+    recorder.bound("checkpoint", 60, "pending weeks", 203, 255)
+    recorder.bound("claim", 60, "unclaimed weeks", 39, 50)
+
+    assert [(flag.operation, flag.week) for flag in recorder.flags] == [
+        ("large", 53),
+        ("checkpoint", 60),
+    ]
+    rows = recorder.percentiles()
+    assert [(row["operation"], row["from_week"]) for row in rows] == [
+        ("large", 52),
+        ("small", 0),
+    ]
+    assert rows[0]["p50"] == rows[0]["max"] == 25_000_000
+
+
+@pytest.mark.slow
+def test_load_test_smoke(gov):
+    load_test = LoadTest(
+        gov,
+        lockers=6,
+        gauges=2,
+        weeks=6,
+        actions_per_week=2,
+        claims_per_week=3,
+        kicks_per_week=3,
+        gas_budget=3_000_000,
+    )
+    recorder = load_test.run()
+
+    operations = {sample.operation for sample in recorder.samples}
+    assert {
+        "VotingYFI.modify_lock (create)",
+        "VotingYFI.checkpoint",
+        "RewardPool.burn",
+        "RewardPool.claim",
+        "dYFIRewardPool.claim",
+        "EmissionDistributor.startRound",
+        "EmissionDistributor.distribute",
+    } <= operations
+    assert all(sample.gas > 0 for sample in recorder.samples)
+    # a small population stays far from every limit
+    assert recorder.flags == []
+    system = load_test.system
+    assert system.d_yfi.balanceOf(system.gauges[0]) > 0
@@ -0,0 +1,50 @@
+import pytest
+from ape import chain
+
+from veyfi.profiler import write_folded
+
+DAY = 86400
+WEEK = 7 * DAY
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+@pytest.fixture(autouse=True)
+def tracing():
+    if not chain.provider.supports_tracing:
+        pytest.skip("the provider can't trace transactions")
+
+
+def test_profile_claim(yfi, ve_yfi, ve_yfi_rewards, whale, gov, gas_profile, tmp_path):
+    amount = 10**22
+    yfi.mint(whale, amount, sender=whale)
+    yfi.approve(ve_yfi, amount, sender=whale)
+    ve_yfi.modify_lock(amount, chain.pending_timestamp + 365 * DAY, sender=whale)
+    yfi.mint(gov, 10**18, sender=gov)
+    yfi.approve(ve_yfi_rewards, 10**18, sender=gov)
+    chain.pending_timestamp += 3 * WEEK
+    ve_yfi_rewards.burn(sender=gov)
+    chain.pending_timestamp += WEEK
+
+    tx = ve_yfi_rewards.claim(sender=whale)
+    profile = gas_profile("claim", tx)
+
+    claim = profile.functions["RewardPool.claim"]
+    assert claim.sloads > 0
+    assert claim.cold + claim.warm == claim.sloads + claim.sstores
+    assert claim.calls > 0
+    # the external VotingYFI reads are attributed to their own frames
+    assert any(
+        len(stack) > 1 and stack[1].startswith("VotingYFI.") for stack in profile.stacks
+    )
+    # every opcode of the trace is charged once
+    frames = list(tx.trace)
+    assert profile.gas == frames[0].gas - frames[-1].gas + frames[-1].gas_cost
+    assert sum(stats.gas for stats in profile.functions.values()) == profile.gas
+
+    path = tmp_path / "claim.folded"
+    write_folded(profile, path)
+    for line in path.read_text().splitlines():
+        stack, gas = line.rsplit(" ", 1)
+        assert stack.startswith("RewardPool.claim")
+        assert int(gas) > 0
@@ -150,6 +150,7 @@ def test_oracle(project, yfi, d_yfi, ve_yfi, gov):
         redemption.get_latest_price()
 
 
+@pytest.mark.fork
 def test_chainlink_oracle(project, yfi, d_yfi, ve_yfi, gov):
     yfiusd = ape.project.AggregatorV3Interface.at(
         "0xA027702dbb89fbd58938e4324ac03B58d812b0E1"
@@ -172,6 +173,7 @@ def test_chainlink_oracle(project, yfi, d_yfi, ve_yfi, gov):
     assert redemption.get_latest_price() == actual
 
 
+@pytest.mark.fork
 def test_redeployment_oracle(chain, accounts, project, d_yfi, ve_yfi, gov):
     ychad = accounts["0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52"]
     pool = ape.Contract("0xC26b89A667578ec7b3f11b2F98d6Fd15C07C54ba")
@@ -0,0 +1,40 @@
+import pytest
+from ape import chain
+
+from veyfi.indexer import Indexer
+from veyfi.snapshot import snapshot
+
+DAY = 86400
+WEEK = 7 * DAY
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+def test_snapshot_matches_prior_votes(tmp_path, yfi, ve_yfi, whale, shark, fish):
+    start_block = chain.blocks.head.number
+    amount = 10**21
+    for user, duration in [(whale, 5 * 365 * DAY), (shark, 20 * WEEK), (fish, WEEK)]:
+        yfi.mint(user, 2 * amount, sender=user)
+        yfi.approve(ve_yfi, 2 * amount, sender=user)
+        ve_yfi.modify_lock(amount, chain.pending_timestamp + duration, sender=user)
+        chain.pending_timestamp += DAY
+
+    heights = [chain.blocks.head.number]
+    chain.pending_timestamp += 3 * WEEK
+    ve_yfi.modify_lock(amount, 0, sender=shark)
+    heights.append(chain.blocks.head.number)
+    chain.pending_timestamp += WEEK
+    ve_yfi.withdraw(sender=fish)
+    chain.pending_timestamp += 10 * WEEK
+    ve_yfi.checkpoint(sender=whale)
+    chain.mine(5)
+    heights.append(chain.blocks.head.number - 3)
+
+    indexer = Indexer(str(tmp_path / "veyfi.db"))
+    indexer.add_contract(ve_yfi, "ve_yfi", start_block)
+    indexer.sync()
+    for height in heights:
+        balances = snapshot(indexer, ve_yfi, height)
+        assert set(balances) == {str(whale), str(shark), str(fish)}
+        for user in (whale, shark, fish):
+            assert balances[str(user)] == ve_yfi.getPriorVotes(user, height)
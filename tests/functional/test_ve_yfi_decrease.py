@@ -9,13 +9,7 @@ TOL = 120 / WEEK
 AMOUNT = 10**18
 POWER = AMOUNT // MAXTIME * MAXTIME
 
-
-@pytest.fixture(autouse=True)
-def setup_time(chain):
-    chain.pending_timestamp += WEEK - (
-        chain.pending_timestamp - (chain.pending_timestamp // WEEK * WEEK)
-    )
-    chain.mine()
+pytestmark = pytest.mark.usefixtures("setup_time")
 
 
 @pytest.fixture()
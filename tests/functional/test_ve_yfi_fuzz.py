@@ -0,0 +1,180 @@
+import os
+from copy import deepcopy
+
+import ape
+import pytest
+from ape import chain
+from hypothesis import HealthCheck, settings
+from hypothesis import strategies as st
+from hypothesis.stateful import (
+    RuleBasedStateMachine,
+    invariant,
+    rule,
+    run_state_machine_as_test,
+)
+
+from veyfi.model import Revert, RewardPoolModel, VotingYFIModel
+
+DAY = 86400
+WEEK = 7 * DAY
+YEAR = 365 * DAY
+
+# `VEYFI_FUZZ_PROFILE=ci VEYFI_TEST_BACKEND=evm ape test -k fuzz` runs the long
+# campaign on the in-process EVM.
+settings.register_profile(
+    "dev",
+    max_examples=20,
+    stateful_step_count=25,
+    deadline=None,
+    suppress_health_check=[HealthCheck.too_slow, HealthCheck.data_too_large],
+)
+settings.register_profile("ci", settings.get_profile("dev"), max_examples=2000)
+FUZZ_SETTINGS = settings.get_profile(os.environ.get("VEYFI_FUZZ_PROFILE", "dev"))
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+class VotingYFIMachine(RuleBasedStateMachine):
+    """
+    Random sequences of locks, withdrawals, burns, checkpoints and claims
+    replayed on VotingYFI, RewardPool and their reference models, which must
+    agree on every balance, supply and claimed amount.
+    """
+
+    # set by the test
+    yfi = ve_yfi = reward_pool = gov = users = None
+
+    def __init__(self):
+        super().__init__()
+        self.snapshot = chain.snapshot()
+        self.now = chain.blocks.head.timestamp
+        ve = VotingYFIModel(self.ve_yfi.point_history(self.ve_yfi, 0).ts)
+        self.pool = RewardPoolModel(ve, self.reward_pool.start_time())
+
+    def teardown(self):
+        chain.restore(self.snapshot)
+
+    def apply(self, model_action, chain_action):
+        """
+        Run an action on the models and the chain at the next timestamp. Where
+        the model reverts the transaction must revert too, and the models are
+        rolled back.
+
+        :return: the result of the model action, None if it reverted.
+        """
+        self.now += 1
+        chain.pending_timestamp = self.now
+        backup = deepcopy(self.pool)
+        try:
+            result = model_action(self.now)
+        except Revert:
+            self.pool = backup
+            with ape.reverts():
+                chain_action()
+            return None
+        chain_action()
+        assert chain.blocks.head.timestamp == self.now
+        return result
+
+    @rule(seconds=st.one_of(st.integers(1, WEEK), st.integers(WEEK, 3 * YEAR)))
+    def sleep(self, seconds):
+        self.now += seconds
+
+    @rule(
+        user=st.integers(0, 8),
+        amount=st.sampled_from([0, 10**17, 10**18, 25 * 10**18]),
+        weeks=st.sampled_from([0, 1, 2, 52, 208, 209, 400, 600]),
+    )
+    def modify_lock(self, user, amount, weeks):
+        user = self.users[user]
+        unlock_time = 0 if weeks == 0 else self.now + 1 + weeks * WEEK
+        self.apply(
+            lambda ts: self.pool.ve.modify_lock(user, amount, unlock_time, ts),
+            lambda: self.ve_yfi.modify_lock(amount, unlock_time, sender=user),
+        )
+
+    @rule(user=st.integers(0, 8))
+    def withdraw(self, user):
+        user = self.users[user]
+
+        def model_withdraw(ts):
+            returned, penalty = self.pool.ve.withdraw(user, ts)
+            # VotingYFI burns the penalty into the reward pool
+            self.pool.burn(penalty, ts)
+            return returned
+
+        balance = self.yfi.balanceOf(user)
+        returned = self.apply(model_withdraw, lambda: self.ve_yfi.withdraw(sender=user))
+        if returned is not None:
+            assert self.yfi.balanceOf(user) - balance == returned
+
+    @rule(amount=st.sampled_from([0, 10**18, 10**21]))
+    def burn(self, amount):
+        self.apply(
+            lambda ts: self.pool.burn(amount, ts),
+            lambda: self.reward_pool.burn(amount, sender=self.gov),
+        )
+
+    @rule(max_weeks=st.sampled_from([1, 10, 255]))
+    def checkpoint(self, max_weeks):
+        self.apply(
+            lambda ts: self.pool.ve.checkpoint(ts, max_weeks),
+            lambda: self.ve_yfi.checkpoint(max_weeks, sender=self.gov),
+        )
+
+    @rule()
+    def checkpoint_token(self):
+        self.apply(
+            self.pool.checkpoint_token,
+            lambda: self.reward_pool.checkpoint_token(sender=self.gov),
+        )
+
+    @rule()
+    def checkpoint_total_supply(self):
+        self.apply(
+            self.pool.checkpoint_total_supply,
+            lambda: self.reward_pool.checkpoint_total_supply(sender=self.gov),
+        )
+
+    @rule(user=st.integers(0, 8), max_weeks=st.sampled_from([1, 50]))
+    def claim(self, user, max_weeks):
+        user = self.users[user]
+        balance = self.yfi.balanceOf(user)
+        claimed = self.apply(
+            lambda ts: self.pool.claim(user, ts, max_weeks),
+            lambda: self.reward_pool.claim(user, False, max_weeks, sender=user),
+        )
+        if claimed is not None:
+            assert self.yfi.balanceOf(user) - balance == claimed
+
+    @invariant()
+    def balances_match(self):
+        ts = chain.blocks.head.timestamp
+        expected = self.pool.ve.balances(self.users, [ts])[:, 0]
+        assert self.ve_yfi.balanceOfMany(self.users, ts) == list(expected)
+        assert self.ve_yfi.totalSupply(ts) == self.pool.ve.total_supply(ts)
+
+    @invariant()
+    def reward_pool_matches(self):
+        assert self.reward_pool.time_cursor() == self.pool.time_cursor
+        assert self.reward_pool.last_token_time() == self.pool.last_token_time
+        assert self.reward_pool.token_last_balance() == self.pool.token_last_balance
+        assert self.yfi.balanceOf(self.reward_pool) == self.pool.balance
+
+
+def test_voting_yfi_and_reward_pool_match_models(
+    accounts, yfi, ve_yfi, ve_yfi_rewards, gov
+):
+    users = list(accounts[1:10])
+    for user in users:
+        yfi.mint(user, 10**24, sender=user)
+        yfi.approve(ve_yfi, 2**256 - 1, sender=user)
+    yfi.mint(gov, 10**26, sender=gov)
+    yfi.approve(ve_yfi_rewards, 2**256 - 1, sender=gov)
+
+    VotingYFIMachine.yfi = yfi
+    VotingYFIMachine.ve_yfi = ve_yfi
+    VotingYFIMachine.reward_pool = ve_yfi_rewards
+    VotingYFIMachine.gov = gov
+    VotingYFIMachine.users = users
+    run_state_machine_as_test(VotingYFIMachine, settings=FUZZ_SETTINGS)
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+from ape import chain
+
+from veyfi.model import GLOBAL, MAX_LOCK_DURATION, WEEK, VotingYFIModel
+
+pytestmark = pytest.mark.usefixtures("setup_time")
+
+
+def test_model_matches_contract(accounts, yfi, ve_yfi):
+    random.seed(42)
+    users = accounts[:5]
+    for user in users:
+        yfi.mint(user, 10**24, sender=user)
+        yfi.approve(ve_yfi.address, 10**24, sender=user)
+    model = VotingYFIModel(ve_yfi.point_history(ve_yfi, 0).ts)
+    start = chain.blocks.head.timestamp
+
+    for _ in range(40):
+        user = random.choice(users)
+        lock = ve_yfi.locked(user)
+        now = chain.pending_timestamp
+        if lock.amount == 0:
+            amount = random.randint(1, 100) * 10**18
+            unlock_time = now + random.randint(2, 500) * WEEK
+            ve_yfi.modify_lock(amount, unlock_time, sender=user)
+            model.modify_lock(user, amount, unlock_time, chain.blocks.head.timestamp)
+        elif lock.end > now and random.random() < 0.5:
+            amount = random.randint(0, 10) * 10**18
+            unlock_time = max(lock.end + WEEK, now + MAX_LOCK_DURATION + 2 * WEEK)
+            ve_yfi.modify_lock(amount, unlock_time, sender=user)
+            model.modify_lock(user, amount, unlock_time, chain.blocks.head.timestamp)
+        else:
+            ve_yfi.withdraw(sender=user)
+            model.withdraw(user, chain.blocks.head.timestamp)
+        chain.pending_timestamp += random.choice([3600, 3 * 86400, WEEK, 10 * WEEK])
+
+    ve_yfi.checkpoint(sender=users[0])
+    model.checkpoint(chain.blocks.head.timestamp)
+
+    now = chain.blocks.head.timestamp
+    timestamps = list(range(start // WEEK * WEEK + WEEK, now + 520 * WEEK, 3 * WEEK))
+    timestamps = sorted(timestamps + [now])
+    expected = model.balances(users, timestamps)
+    for user, balances in zip(users, expected):
+        assert ve_yfi.balanceOfAt(user, timestamps) == list(balances)
+    assert ve_yfi.totalSupplyMany(timestamps) == list(
+        model.total_supply_many(timestamps)
+    )
+    assert ve_yfi.epoch(ve_yfi) == model.epoch(GLOBAL)
+
+
+def test_model_penalty(accounts, yfi, ve_yfi):
+    alice = accounts[0]
+    amount = 10**21
+    yfi.mint(alice, amount, sender=alice)
+    yfi.approve(ve_yfi.address, amount, sender=alice)
+    model = VotingYFIModel(ve_yfi.point_history(ve_yfi, 0).ts)
+
+    unlock_time = chain.pending_timestamp + 2 * 365 * 86400
+    ve_yfi.modify_lock(amount, unlock_time, sender=alice)
+    model.modify_lock(alice, amount, unlock_time, chain.blocks.head.timestamp)
+    chain.pending_timestamp += 30 * 86400
+
+    ve_yfi.withdraw(sender=alice)
+    returned, penalty = model.withdraw(alice, chain.blocks.head.timestamp)
+    assert 0 < penalty < amount
+    assert yfi.balanceOf(alice) == returned == amount - penalty
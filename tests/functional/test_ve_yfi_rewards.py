@@ -5,14 +5,9 @@ from ape import chain
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 DAY = 86400
 WEEK = 7 * DAY
+MAXTIME = 4 * 365 * DAY // WEEK * WEEK
 
-
-@pytest.fixture(autouse=True)
-def setup_time(chain):
-    chain.pending_timestamp += WEEK - (
-        chain.pending_timestamp - (chain.pending_timestamp // WEEK * WEEK)
-    )
-    chain.mine()
+pytestmark = pytest.mark.usefixtures("setup_time")
 
 
 def test_ve_yfi_claim(yfi, ve_yfi, whale, ve_yfi_rewards, gov):
@@ -74,3 +69,174 @@ def test_ve_yfi_claim_for(yfi, ve_yfi, whale, fish, ve_yfi_rewards, gov):
     chain.mine()
     ve_yfi_rewards.claim(whale, sender=fish)
     assert yfi.balanceOf(whale) == rewards
+
+
+def test_ve_yfi_claim_many_weeks(yfi, ve_yfi, whale, shark, ve_yfi_rewards, gov):
+    # whale's lock is longer than 4 years, its decay starts with a kink during the claim
+    for user, duration in [(whale, MAXTIME + 5 * WEEK), (shark, 20 * WEEK)]:
+        yfi.mint(user, 10**22, sender=user)
+        yfi.approve(ve_yfi, 10**22, sender=user)
+        ve_yfi.modify_lock(10**22, chain.pending_timestamp + duration, sender=user)
+    first_week = (ve_yfi.point_history(whale, 1).ts + WEEK - 1) // WEEK * WEEK
+    start = max(ve_yfi_rewards.start_time(), first_week)
+
+    rewards = 10**18
+    yfi.mint(gov, rewards * 12, sender=gov)
+    yfi.approve(ve_yfi_rewards, rewards * 12, sender=gov)
+    for _ in range(12):
+        chain.pending_timestamp += WEEK
+        ve_yfi_rewards.burn(rewards, sender=gov)
+    chain.pending_timestamp += WEEK
+    chain.mine()
+
+    ve_yfi_rewards.claim(sender=whale)
+    end = ve_yfi_rewards.time_cursor_of(whale)
+    assert end >= start + 10 * WEEK
+
+    expected = 0
+    for week in range(start, end, WEEK):
+        expected += (
+            ve_yfi.balanceOf(whale, week)
+            * ve_yfi_rewards.tokens_per_week(week)
+            // ve_yfi_rewards.ve_supply(week)
+        )
+    assert expected > 0
+    assert yfi.balanceOf(whale) == expected
+
+
+def test_ve_yfi_claim_gas_per_week(yfi, ve_yfi, whale, shark, ve_yfi_rewards, gov):
+    for user, duration in [(whale, MAXTIME + 5 * WEEK), (shark, 20 * WEEK)]:
+        yfi.mint(user, 10**22, sender=user)
+        yfi.approve(ve_yfi, 10**22, sender=user)
+        ve_yfi.modify_lock(10**22, chain.pending_timestamp + duration, sender=user)
+
+    rewards = 10**18
+    yfi.mint(gov, rewards * 52, sender=gov)
+    yfi.approve(ve_yfi_rewards, rewards * 52, sender=gov)
+    for _ in range(52):
+        chain.pending_timestamp += WEEK
+        ve_yfi_rewards.burn(rewards, sender=gov)
+        ve_yfi_rewards.checkpoint_total_supply(sender=gov)
+    chain.pending_timestamp += WEEK
+    ve_yfi_rewards.checkpoint_total_supply(sender=gov)
+    ve_yfi_rewards.checkpoint_token(sender=gov)
+
+    gas = {
+        weeks: ve_yfi_rewards.claim.estimate_gas_cost(whale, False, weeks, sender=whale)
+        for weeks in [1, 10, 50]
+    }
+    # a week reads its tokens, supply and slope change, without a balanceOf
+    # call replaying the lock, which cost over 20k gas per week before
+    assert (gas[10] - gas[1]) / 9 < 15_000
+    assert (gas[50] - gas[10]) / 40 < 15_000
+    assert gas[50] < 1_000_000
+
+
+def test_ve_yfi_claimable_and_paged_claim(
+    yfi, ve_yfi, whale, shark, ve_yfi_rewards, gov
+):
+    for user, duration in [(whale, MAXTIME + 5 * WEEK), (shark, 20 * WEEK)]:
+        yfi.mint(user, 10**22, sender=user)
+        yfi.approve(ve_yfi, 10**22, sender=user)
+        ve_yfi.modify_lock(10**22, chain.pending_timestamp + duration, sender=user)
+
+    rewards = 10**18
+    yfi.mint(gov, rewards * 12, sender=gov)
+    yfi.approve(ve_yfi_rewards, rewards * 12, sender=gov)
+    for _ in range(12):
+        chain.pending_timestamp += WEEK
+        ve_yfi_rewards.burn(rewards, sender=gov)
+    chain.pending_timestamp += WEEK
+    chain.mine()
+    ve_yfi_rewards.checkpoint_token(sender=gov)
+
+    (total, last_cursor) = ve_yfi_rewards.claimable(whale)
+    assert total > 0
+    assert last_cursor == chain.blocks.head.timestamp // WEEK * WEEK
+
+    (amount, cursor) = ve_yfi_rewards.claimable(whale, 5)
+    assert 0 < amount < total
+    assert cursor < last_cursor
+
+    ve_yfi_rewards.claim(whale, False, 5, sender=whale)
+    assert yfi.balanceOf(whale) == amount
+    assert ve_yfi_rewards.time_cursor_of(whale) == cursor
+    assert ve_yfi_rewards.claimable(whale) == (total - amount, last_cursor)
+
+    ve_yfi_rewards.claim(sender=whale)
+    assert yfi.balanceOf(whale) == total
+    assert ve_yfi_rewards.time_cursor_of(whale) == last_cursor
+    assert ve_yfi_rewards.claimable(whale) == (0, last_cursor)
+
+
+def test_ve_yfi_claim_after_supply_checkpoint_gap(
+    yfi, ve_yfi, whale, ve_yfi_rewards, gov
+):
+    yfi.mint(whale, 10**22, sender=whale)
+    yfi.approve(ve_yfi, 10**22, sender=whale)
+    ve_yfi.modify_lock(10**22, chain.pending_timestamp + MAXTIME, sender=whale)
+    rewards = 10**18
+    yfi.mint(gov, rewards, sender=gov)
+    yfi.approve(ve_yfi_rewards, rewards, sender=gov)
+    chain.pending_timestamp += WEEK
+    ve_yfi_rewards.burn(rewards, sender=gov)
+    chain.pending_timestamp += 45 * WEEK
+
+    # the claim checkpoints 40 weeks of supply and can't price the weeks after
+    with ape.reverts():
+        ve_yfi_rewards.claim(sender=whale)
+
+    ve_yfi_rewards.checkpoint_total_supply(sender=gov)
+    assert ve_yfi_rewards.time_cursor() > chain.pending_timestamp
+    ve_yfi_rewards.checkpoint_token(sender=gov)
+    (amount, cursor) = ve_yfi_rewards.claimable(whale)
+    assert 0 < amount <= rewards
+
+    ve_yfi_rewards.claim(sender=whale)
+    assert yfi.balanceOf(whale) == amount
+    assert ve_yfi_rewards.time_cursor_of(whale) == cursor
+
+
+def test_ve_yfi_claim_many(yfi, ve_yfi, whale, shark, fish, panda, ve_yfi_rewards, gov):
+    for user, duration in [(whale, MAXTIME), (shark, 20 * WEEK)]:
+        yfi.mint(user, 10**22, sender=user)
+        yfi.approve(ve_yfi, 10**22, sender=user)
+        ve_yfi.modify_lock(10**22, chain.pending_timestamp + duration, sender=user)
+    # only whale lets panda relock on their behalf
+    ve_yfi_rewards.toggle_allowed_to_relock(panda, sender=whale)
+
+    rewards = 10**18
+    yfi.mint(gov, rewards * 6, sender=gov)
+    yfi.approve(ve_yfi_rewards, rewards * 6, sender=gov)
+    for _ in range(6):
+        chain.pending_timestamp += WEEK
+        ve_yfi_rewards.burn(rewards, sender=gov)
+    chain.pending_timestamp += WEEK
+    chain.mine()
+    ve_yfi_rewards.checkpoint_token(sender=gov)
+
+    users = [whale, shark, fish]
+    expected = [ve_yfi_rewards.claimable(user)[0] for user in users]
+    assert expected[0] > 0 and expected[1] > 0 and expected[2] == 0
+    whale_locked = ve_yfi.locked(whale).amount
+
+    tx = ve_yfi_rewards.claim_many(users, True, sender=panda)
+    assert tx.return_value == expected
+    assert ve_yfi.locked(whale).amount == whale_locked + expected[0]
+    assert yfi.balanceOf(whale) == 0
+    assert yfi.balanceOf(shark) == expected[1]
+    assert ve_yfi_rewards.token_last_balance() == yfi.balanceOf(ve_yfi_rewards)
+
+    assert ve_yfi_rewards.claim_many(users, sender=panda).return_value == [0, 0, 0]
+
+
+def test_ve_yfi_claimable_before_first_week(yfi, ve_yfi, whale, ve_yfi_rewards):
+    yfi.mint(whale, 10**22, sender=whale)
+    yfi.approve(ve_yfi, 10**22, sender=whale)
+    ve_yfi.modify_lock(10**22, chain.pending_timestamp + 20 * WEEK, sender=whale)
+    first_week = (ve_yfi.point_history(whale, 1).ts + WEEK - 1) // WEEK * WEEK
+
+    # nothing to claim yet, the view still reports where the claim would start
+    assert ve_yfi_rewards.claimable(whale) == (0, first_week)
+    ve_yfi_rewards.claim(sender=whale)
+    assert ve_yfi_rewards.time_cursor_of(whale) == 0
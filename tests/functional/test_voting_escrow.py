@@ -9,13 +9,7 @@ WEEK = 7 * DAY
 MAXTIME = 4 * 365 * 86400 // WEEK * WEEK
 TOL = 120 / WEEK
 
-
-@pytest.fixture(autouse=True)
-def setup_time(chain):
-    chain.pending_timestamp += WEEK - (
-        chain.pending_timestamp - (chain.pending_timestamp // WEEK * WEEK)
-    )
-    chain.mine()
+pytestmark = pytest.mark.usefixtures("setup_time")
 
 
 def test_over_four_years(chain, accounts, yfi, ve_yfi):
@@ -79,7 +73,7 @@ def test_lock_slightly_over_limit_is_rounded_down(chain, accounts, yfi, ve_yfi):
     assert ve_yfi.balanceOf(alice) < (amount * 2) // MAXTIME * MAXTIME
 
 
-def test_get_prior_votes(chain, accounts, yfi, ve_yfi):
+def test_get_prior_votes(chain, accounts, yfi, ve_yfi, time_travel):
     alice = accounts[0]
     amount = 1000 * 10**18
     power = amount // MAXTIME * MAXTIME
@@ -90,9 +84,7 @@ def test_get_prior_votes(chain, accounts, yfi, ve_yfi):
     unlock_time = now + MAXTIME + WEEK + 4
     ve_yfi.modify_lock(amount, unlock_time, sender=alice)  # 4 years ++
 
-    for _ in range(5 * 7 * 24):
-        chain.pending_timestamp += H - 1
-        chain.mine()
+    time_travel(5 * 7 * 24, H - 1)
 
     assert ve_yfi.getPriorVotes(alice, chain.blocks.head.number) < power
 
@@ -146,7 +138,7 @@ def test_multiple_lock_decay(accounts, yfi, ve_yfi):
     assert ve_yfi.totalSupply() == 0
 
 
-def test_voting_powers(chain, accounts, yfi, ve_yfi):
+def test_voting_powers(chain, accounts, yfi, ve_yfi, time_travel):
     """
     Test voting power in the following scenario.
     Alice:
@@ -213,9 +205,7 @@ def test_voting_powers(chain, accounts, yfi, ve_yfi):
     stages["alice_in_0"] = []
     stages["alice_in_0"].append((chain.blocks.head.number, chain.blocks.head.timestamp))
     for i in range(7):
-        for _ in range(24):
-            chain.pending_timestamp += H - 1
-            chain.mine()
+        time_travel(24, H - 1)
         dt = chain.blocks.head.timestamp - t0
         assert approx(ve_yfi.totalSupply(), rel=TOL) == amount // MAXTIME * max(
             WEEK - 2 * H - dt, 0
@@ -270,9 +260,7 @@ def test_voting_powers(chain, accounts, yfi, ve_yfi):
     # Beginning of week: weight 3
     # End of week: weight 1
     for i in range(7):
-        for _ in range(24):
-            chain.pending_timestamp += H - 1
-            chain.mine()
+        time_travel(24, H - 1)
         dt = chain.blocks.head.timestamp - t0
         w_total = ve_yfi.totalSupply()
         w_alice = ve_yfi.balanceOf(alice)
@@ -301,9 +289,7 @@ def test_voting_powers(chain, accounts, yfi, ve_yfi):
 
     stages["alice_in_2"] = []
     for i in range(7):
-        for _ in range(24):
-            chain.pending_timestamp += H - 1
-            chain.mine()
+        time_travel(24, H - 1)
         dt = chain.blocks.head.timestamp - t0
         w_total = ve_yfi.totalSupply()
         w_alice = ve_yfi.balanceOf(alice)
@@ -479,3 +465,188 @@ def test_lock_cant_exceed_reply_range(chain, accounts, yfi, ve_yfi):
     unlock_time = now + 530 * WEEK
     with ape.reverts():
         ve_yfi.modify_lock(amount, unlock_time, sender=alice)
+
+
+def test_replay_gas_does_not_grow_with_elapsed_weeks(chain, accounts, yfi, ve_yfi):
+    alice = accounts[0]
+    amount = 1000 * 10**18
+    yfi.mint(alice, amount, sender=alice)
+    yfi.approve(ve_yfi.address, amount, sender=alice)
+
+    now = chain.blocks.head.timestamp
+    # lock with a kink: two slope changes over the whole replay range
+    ve_yfi.modify_lock(amount, now + MAXTIME + 10 * WEEK, sender=alice)
+    now = chain.blocks.head.timestamp
+
+    balance_gas = {}
+    supply_gas = {}
+    for weeks in [1, 10, 50, 100, 200, 300, 500]:
+        balance_gas[weeks] = ve_yfi.balanceOf.estimate_gas_cost(
+            alice, now + weeks * WEEK
+        )
+        supply_gas[weeks] = ve_yfi.totalSupply.estimate_gas_cost(now + weeks * WEEK)
+
+    # only the weeks with a slope change and the bitmap words are read
+    assert max(balance_gas.values()) - balance_gas[1] < 15_000
+    assert max(supply_gas.values()) - supply_gas[1] < 15_000
+
+
+def test_replay_gas_with_dense_slope_changes(chain, accounts, yfi, ve_yfi):
+    gov = accounts[0]
+    amount = 1000 * 10**18
+    now = chain.blocks.head.timestamp
+    users = []
+    # 32 locks ending in consecutive weeks, every 4th one with a kink at its
+    # end week and a final slope change 4 years later
+    for i in range(32):
+        user = accounts.generate_test_account()
+        gov.transfer(user, 10**18)
+        yfi.mint(user, amount, sender=user)
+        yfi.approve(ve_yfi.address, amount, sender=user)
+        duration = (i + 1) * WEEK + (MAXTIME if i % 4 == 0 else 0)
+        ve_yfi.modify_lock(amount, now + duration, sender=user)
+        users.append(user)
+    now = chain.blocks.head.timestamp
+
+    supply_gas = {}
+    balance_gas = {}
+    for weeks in [1, 33, 100, 200, 240, 300, 500]:
+        supply_gas[weeks] = ve_yfi.totalSupply.estimate_gas_cost(now + weeks * WEEK)
+        balance_gas[weeks] = ve_yfi.balanceOf.estimate_gas_cost(
+            users[0], now + weeks * WEEK
+        )
+
+    # each week with a slope change costs a bounded lookup
+    assert supply_gas[33] - supply_gas[1] < 32 * 6_000
+    assert supply_gas[300] - supply_gas[200] < 8 * 6_000
+    # the weeks without one are skipped by the bitmap
+    assert supply_gas[200] - supply_gas[33] < 15_000
+    assert supply_gas[500] - supply_gas[240] < 15_000
+    # a user only visits their own slope changes
+    assert max(balance_gas.values()) - balance_gas[1] < 15_000
+
+
+def test_weekly_supply(chain, accounts, yfi, ve_yfi):
+    alice, bob = accounts[:2]
+    amount = 1000 * 10**18
+    for user, duration in [(alice, MAXTIME + 2 * WEEK), (bob, 3 * WEEK)]:
+        yfi.mint(user, amount, sender=user)
+        yfi.approve(ve_yfi.address, amount, sender=user)
+        ve_yfi.modify_lock(amount, chain.blocks.head.timestamp + duration, sender=user)
+    first_week = chain.blocks.head.timestamp // WEEK * WEEK + WEEK
+
+    chain.pending_timestamp += 6 * WEEK
+    ve_yfi.checkpoint(sender=alice)
+
+    for week in range(first_week, chain.blocks.head.timestamp, WEEK):
+        assert ve_yfi.weekly_supply(week) == ve_yfi.totalSupply(week)
+    assert ve_yfi.weekly_supply(first_week) > ve_yfi.weekly_supply(first_week + WEEK)
+    assert ve_yfi.weekly_supply(first_week + 3 * WEEK) == ve_yfi.balanceOf(
+        alice, first_week + 3 * WEEK
+    )
+
+
+def test_slope_changes_in_consecutive_weeks(chain, accounts, yfi, ve_yfi):
+    alice, bob = accounts[:2]
+    amount = 1000 * 10**18
+    # an even week and the following odd week share a storage slot
+    end = (chain.blocks.head.timestamp // WEEK + 10) // 2 * 2 * WEEK
+    for user, lock_end in [(alice, end), (bob, end + WEEK)]:
+        yfi.mint(user, amount, sender=user)
+        yfi.approve(ve_yfi.address, amount, sender=user)
+        ve_yfi.modify_lock(amount, lock_end, sender=user)
+
+    slope = amount // MAXTIME
+    assert ve_yfi.slope_changes(alice, end) == -slope
+    assert ve_yfi.slope_changes(alice, end + WEEK) == 0
+    assert ve_yfi.slope_changes(bob, end) == 0
+    assert ve_yfi.slope_changes(bob, end + WEEK) == -slope
+    assert ve_yfi.slope_changes(ve_yfi, end) == -slope
+    assert ve_yfi.slope_changes(ve_yfi, end + WEEK) == -slope
+    assert ve_yfi.slope_changes(ve_yfi, end + 1) == 0
+
+    point = ve_yfi.point_history(bob, 1)
+    assert point.slope == slope
+    assert point.bias == slope * (end + WEEK - point.ts)
+    assert point.ts == chain.blocks.head.timestamp
+    assert point.blk == chain.blocks.head.number
+
+    chain.pending_timestamp += 11 * WEEK
+    ve_yfi.checkpoint(sender=alice)
+    assert ve_yfi.totalSupply() == 0
+    assert ve_yfi.point_history(ve_yfi, ve_yfi.epoch(ve_yfi)).slope == 0
+
+
+def test_checkpoint_max_weeks(chain, accounts, yfi, ve_yfi):
+    alice, bob = accounts[:2]
+    amount = 1000 * 10**18
+    for user, duration in [(alice, MAXTIME + 20 * WEEK), (bob, 30 * WEEK)]:
+        yfi.mint(user, amount, sender=user)
+        yfi.approve(ve_yfi.address, amount, sender=user)
+        ve_yfi.modify_lock(amount, chain.blocks.head.timestamp + duration, sender=user)
+    assert ve_yfi.pending_weeks() == 0
+
+    chain.pending_timestamp += 40 * WEEK + H
+    chain.mine()
+    assert ve_yfi.pending_weeks() == 40
+    supply = ve_yfi.totalSupply()
+
+    epoch = ve_yfi.epoch(ve_yfi)
+    ve_yfi.checkpoint(15, sender=alice)
+    assert ve_yfi.epoch(ve_yfi) == epoch + 15
+    last_point = ve_yfi.point_history(ve_yfi, epoch + 15)
+    assert last_point.ts % WEEK == 0
+    assert ve_yfi.weekly_supply(last_point.ts) == last_point.bias
+    assert ve_yfi.pending_weeks() == 25
+    assert ve_yfi.totalSupply() == supply
+
+    ve_yfi.checkpoint(15, sender=alice)
+    assert ve_yfi.pending_weeks() == 10
+
+    # the remaining weeks are recorded by the next user checkpoint
+    ve_yfi.withdraw(sender=bob)
+    assert ve_yfi.pending_weeks() == 0
+    assert ve_yfi.totalSupply() == ve_yfi.balanceOf(alice)
+    first_week = chain.blocks.head.timestamp // WEEK * WEEK - 39 * WEEK
+    for week in range(first_week, chain.blocks.head.timestamp, WEEK):
+        assert ve_yfi.weekly_supply(week) == ve_yfi.totalSupply(week)
+
+
+def test_batched_balances(chain, accounts, yfi, ve_yfi):
+    alice, bob, carol = accounts[:3]
+    amount = 1000 * 10**18
+    for user, duration in [(alice, MAXTIME + 5 * WEEK), (bob, 20 * WEEK)]:
+        yfi.mint(user, 2 * amount, sender=user)
+        yfi.approve(ve_yfi.address, 2 * amount, sender=user)
+        ve_yfi.modify_lock(amount, chain.blocks.head.timestamp + duration, sender=user)
+    chain.pending_timestamp += 3 * WEEK + DAY
+    ve_yfi.modify_lock(amount, 0, sender=bob)
+    chain.pending_timestamp += 2 * WEEK
+    chain.mine()
+
+    users = [alice, bob, carol]
+    assert ve_yfi.balanceOfMany(users) == [ve_yfi.balanceOf(user) for user in users]
+
+    now = chain.blocks.head.timestamp
+    week = now // WEEK * WEEK
+    timestamps = [
+        week - 5 * WEEK,
+        week - 4 * WEEK,
+        week - 2 * WEEK + H,
+        week - 2 * WEEK + H,
+        week,
+        now,
+        week + 10 * WEEK,
+        week + 30 * WEEK,
+        week + MAXTIME,
+    ]
+    for user in users:
+        assert ve_yfi.balanceOfAt(user, timestamps) == [
+            ve_yfi.balanceOf(user, ts) for ts in timestamps
+        ]
+    assert ve_yfi.totalSupplyMany(timestamps[1:]) == [
+        ve_yfi.totalSupply(ts) for ts in timestamps[1:]
+    ]
+
+    with ape.reverts():
+        ve_yfi.balanceOfAt(alice, [now, week])
@@ -0,0 +1,3 @@
+"""
+Off-chain tooling for veYFI.
+"""
@@ -0,0 +1,57 @@
+"""
+Driver for `EmissionDistributor`: fund a round and fan the rewards out to the
+gauges in pages that fit a gas budget.
+"""
+from typing import Optional
+
+
+def estimate_distribute_gas(distributor, sender) -> tuple:
+    """
+    Estimate the fixed and per-gauge gas of `EmissionDistributor.distribute`
+    from funding the next one and two gauges.
+
+    :return: (base gas, gas per gauge)
+    """
+    one = distributor.distribute.estimate_gas_cost(1, sender=sender)
+    remaining = distributor.gaugeCount() - distributor.cursor()
+    if remaining < 2:
+        return one, one
+    two = distributor.distribute.estimate_gas_cost(2, sender=sender)
+    per_gauge = max(two - one, 1)
+    return max(one - per_gauge, 0), per_gauge
+
+
+def distribute(
+    distributor,
+    sender,
+    gas_budget: int,
+    amount: Optional[int] = None,
+    max_transactions: Optional[int] = None,
+) -> list:
+    """
+    Start a round of `amount` dYFI if given, then fund the gauges of the current
+    round in transactions of at most `gas_budget` gas.
+
+    :return: the receipts.
+    """
+    receipts = []
+    if amount is not None:
+        receipts.append(distributor.startRound(amount, sender=sender))
+
+    page_size = None
+    while distributor.roundInProgress():
+        if max_transactions is not None and len(receipts) >= max_transactions:
+            break
+        if page_size is None:
+            base_gas, per_gauge = estimate_distribute_gas(distributor, sender)
+            page_size = max((gas_budget - base_gas) // per_gauge, 1)
+        gas = distributor.distribute.estimate_gas_cost(page_size, sender=sender)
+        if gas > gas_budget:
+            if page_size == 1:
+                raise ValueError(f"funding the next gauge needs {gas} gas")
+            page_size //= 2
+            continue
+        receipts.append(
+            distributor.distribute(page_size, sender=sender, gas_limit=gas_budget)
+        )
+    return receipts
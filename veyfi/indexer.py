@@ -0,0 +1,363 @@
+"""
+Streaming event indexer for VotingYFI, the reward pools and the gauges.
+
+Logs of all the indexed contracts are fetched with a single `eth_getLogs` filter
+per block range and stored in SQLite, together with the state derived from them:
+locks and epochs per user, claims and tokens per reward pool and balances per
+gauge. Each block range is committed in one transaction with the last indexed
+block, so an interrupted run resumes where it stopped. Logs are keyed by
+(block number, log index) and state is only derived from logs seen for the first
+time, so ranges can safely be indexed twice.
+
+Amounts are stored as decimal strings since they do not fit in SQLite integers.
+"""
+import json
+import sqlite3
+from typing import Dict, List, Optional
+
+from ape import chain, project
+from ape.types import ContractLog, LogFilter
+from eth_utils import encode_hex, keccak, to_checksum_address
+from hexbytes import HexBytes
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# kind -> (project contract type, indexed events)
+CONTRACT_KINDS = {
+    "ve_yfi": ("VotingYFI", ["ModifyLock", "Withdraw", "Penalty", "Supply"]),
+    "reward_pool": ("RewardPool", ["Claimed", "CheckpointToken", "RewardReceived"]),
+    "d_yfi_reward_pool": (
+        "dYFIRewardPool",
+        ["Claimed", "CheckpointToken", "RewardReceived"],
+    ),
+    "gauge": ("Gauge", ["Transfer", "BoostedBalanceUpdated", "RewardPaid"]),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    address TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    last_block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS logs (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS logs_by_event ON logs (contract, event);
+CREATE TABLE IF NOT EXISTS locks (
+    ve_yfi TEXT NOT NULL,
+    user TEXT NOT NULL,
+    amount TEXT NOT NULL DEFAULT '0',
+    lock_end INTEGER NOT NULL DEFAULT 0,
+    epoch INTEGER NOT NULL DEFAULT 0,
+    penalty TEXT NOT NULL DEFAULT '0',
+    PRIMARY KEY (ve_yfi, user)
+);
+CREATE TABLE IF NOT EXISTS supply (
+    ve_yfi TEXT PRIMARY KEY,
+    supply TEXT NOT NULL,
+    ts INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    pool TEXT NOT NULL,
+    user TEXT NOT NULL,
+    claimed TEXT NOT NULL DEFAULT '0',
+    week_cursor INTEGER NOT NULL DEFAULT 0,
+    max_epoch INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (pool, user)
+);
+CREATE TABLE IF NOT EXISTS pool_tokens (
+    pool TEXT PRIMARY KEY,
+    received TEXT NOT NULL DEFAULT '0',
+    distributed TEXT NOT NULL DEFAULT '0',
+    last_checkpoint INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS gauge_balances (
+    gauge TEXT NOT NULL,
+    account TEXT NOT NULL,
+    balance TEXT NOT NULL DEFAULT '0',
+    boosted_balance TEXT NOT NULL DEFAULT '0',
+    rewards_paid TEXT NOT NULL DEFAULT '0',
+    PRIMARY KEY (gauge, account)
+);
+"""
+
+
+class Indexer:
+    """
+    Index the logs of registered contracts into the SQLite database at `db_path`.
+    """
+
+    def __init__(self, db_path: str):
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+
+    def add_contract(self, address: str, kind: str, start_block: int = 0):
+        """
+        Register a contract to index from `start_block`.
+        Already registered contracts keep their progress.
+        """
+        if kind not in CONTRACT_KINDS:
+            raise ValueError(f"unknown contract kind {kind}")
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO contracts VALUES (?, ?, ?)",
+                (to_checksum_address(str(address)), kind, start_block - 1),
+            )
+
+    def contracts(self) -> Dict[str, str]:
+        return dict(self.db.execute("SELECT address, kind FROM contracts"))
+
+    def last_block(self) -> Optional[int]:
+        """
+        Last block indexed for every registered contract.
+        """
+        (block,) = self.db.execute("SELECT MIN(last_block) FROM contracts").fetchone()
+        return block
+
+    def sync(
+        self,
+        stop_block: Optional[int] = None,
+        chunk_size: int = 2000,
+        confirmations: int = 0,
+    ) -> int:
+        """
+        Index the registered contracts up to `stop_block`, the chain head minus
+        `confirmations` by default.
+
+        :return: the number of new logs.
+        """
+        contracts = self.contracts()
+        if not contracts:
+            return 0
+        if stop_block is None:
+            stop_block = chain.blocks.height - confirmations
+
+        events = {}
+        for kind in set(contracts.values()):
+            contract_type, names = CONTRACT_KINDS[kind]
+            abis = getattr(project, contract_type).contract_type.events
+            for name in names:
+                abi = abis[name]
+                events[encode_hex(keccak(text=abi.selector))] = abi
+
+        new_logs = 0
+        start = self.last_block() + 1
+        while start <= stop_block:
+            end = min(start + chunk_size - 1, stop_block)
+            log_filter = LogFilter(
+                addresses=list(contracts),
+                events=list(events.values()),
+                topic_filter=[list(events)],
+                start_block=start,
+                stop_block=end,
+            )
+            logs = sorted(
+                chain.provider.get_contract_logs(log_filter),
+                key=lambda log: (log.block_number, log.log_index),
+            )
+            with self.db:
+                for log in logs:
+                    kind = contracts.get(log.contract_address)
+                    if kind is not None and self._insert_log(log):
+                        self._apply(kind, log)
+                        new_logs += 1
+                self.db.execute(
+                    "UPDATE contracts SET last_block = ? WHERE last_block < ?",
+                    (end, end),
+                )
+            start = end + 1
+        return new_logs
+
+    def _insert_log(self, log: ContractLog) -> bool:
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                log.block_number,
+                log.log_index,
+                HexBytes(log.transaction_hash).hex(),
+                log.contract_address,
+                log.event_name,
+                json.dumps(dict(log.event_arguments), default=str),
+            ),
+        )
+        return cursor.rowcount == 1
+
+    def _apply(self, kind: str, log: ContractLog):
+        args = log.event_arguments
+        contract = log.contract_address
+        event = log.event_name
+
+        if kind == "ve_yfi":
+            if event == "ModifyLock":
+                self._update_lock(
+                    contract, args["user"], args["amount"], args["locktime"]
+                )
+            elif event == "Withdraw":
+                self._update_lock(contract, args["user"], 0, 0)
+            elif event == "Penalty":
+                self._add(
+                    "locks",
+                    "penalty",
+                    args["amount"],
+                    ve_yfi=contract,
+                    user=args["user"],
+                )
+            elif event == "Supply":
+                self.db.execute(
+                    "INSERT OR REPLACE INTO supply VALUES (?, ?, ?)",
+                    (contract, str(args["new_supply"]), args["ts"]),
+                )
+
+        elif kind in ("reward_pool", "d_yfi_reward_pool"):
+            if event == "Claimed":
+                keys = dict(pool=contract, user=args["recipient"])
+                self._add("claims", "claimed", args["amount"], **keys)
+                self._set(
+                    "claims",
+                    week_cursor=args["week_cursor"],
+                    max_epoch=args["max_epoch"],
+                    **keys,
+                )
+            elif event == "CheckpointToken":
+                self._add("pool_tokens", "distributed", args["tokens"], pool=contract)
+                self._set("pool_tokens", last_checkpoint=args["time"], pool=contract)
+            elif event == "RewardReceived":
+                self._add("pool_tokens", "received", args["amount"], pool=contract)
+
+        elif kind == "gauge":
+            if event == "Transfer":
+                if args["from"] != ZERO_ADDRESS:
+                    self._add(
+                        "gauge_balances",
+                        "balance",
+                        -args["value"],
+                        gauge=contract,
+                        account=args["from"],
+                    )
+                if args["to"] != ZERO_ADDRESS:
+                    self._add(
+                        "gauge_balances",
+                        "balance",
+                        args["value"],
+                        gauge=contract,
+                        account=args["to"],
+                    )
+            elif event == "BoostedBalanceUpdated":
+                self._set(
+                    "gauge_balances",
+                    boosted_balance=str(args["amount"]),
+                    gauge=contract,
+                    account=args["account"],
+                )
+            elif event == "RewardPaid":
+                self._add(
+                    "gauge_balances",
+                    "rewards_paid",
+                    args["reward"],
+                    gauge=contract,
+                    account=args["user"],
+                )
+
+    def _update_lock(self, ve_yfi: str, user: str, amount: int, end: int):
+        # every lock change checkpoints the user, which starts a new epoch
+        keys = dict(ve_yfi=ve_yfi, user=user)
+        self._set("locks", amount=str(amount), lock_end=end, **keys)
+        self.db.execute(
+            "UPDATE locks SET epoch = epoch + 1 WHERE ve_yfi = ? AND user = ?",
+            (ve_yfi, user),
+        )
+
+    def _ensure_row(self, table: str, keys: dict) -> str:
+        columns = ", ".join(keys)
+        placeholders = ", ".join("?" for _ in keys)
+        self.db.execute(
+            f"INSERT OR IGNORE INTO {table} ({columns}) VALUES ({placeholders})",
+            tuple(keys.values()),
+        )
+        return " AND ".join(f"{key} = ?" for key in keys)
+
+    def _set(self, table: str, **values):
+        keys = {k: v for k, v in values.items() if k in _KEYS[table]}
+        updates = {k: v for k, v in values.items() if k not in keys}
+        where = self._ensure_row(table, keys)
+        assignments = ", ".join(f"{column} = ?" for column in updates)
+        self.db.execute(
+            f"UPDATE {table} SET {assignments} WHERE {where}",
+            (*updates.values(), *keys.values()),
+        )
+
+    def _add(self, table: str, column: str, amount: int, **keys):
+        where = self._ensure_row(table, keys)
+        (current,) = self.db.execute(
+            f"SELECT {column} FROM {table} WHERE {where}", tuple(keys.values())
+        ).fetchone()
+        self.db.execute(
+            f"UPDATE {table} SET {column} = ? WHERE {where}",
+            (str(int(current) + amount), *keys.values()),
+        )
+
+    # derived state
+
+    def lock(self, ve_yfi: str, user: str) -> Optional[dict]:
+        row = self.db.execute(
+            "SELECT amount, lock_end, epoch, penalty FROM locks WHERE ve_yfi = ? AND user = ?",
+            (str(ve_yfi), str(user)),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(amount=int(row[0]), end=row[1], epoch=row[2], penalty=int(row[3]))
+
+    def gauge_balance(self, gauge: str, account: str) -> Optional[dict]:
+        row = self.db.execute(
+            "SELECT balance, boosted_balance, rewards_paid FROM gauge_balances "
+            "WHERE gauge = ? AND account = ?",
+            (str(gauge), str(account)),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(
+            balance=int(row[0]), boosted_balance=int(row[1]), rewards_paid=int(row[2])
+        )
+
+    def gauge_stakers(self, gauge: str) -> Dict[str, dict]:
+        """
+        Balance and boosted balance of every account staked in `gauge`.
+        """
+        rows = self.db.execute(
+            "SELECT account, balance, boosted_balance FROM gauge_balances "
+            "WHERE gauge = ? AND balance != '0'",
+            (str(gauge),),
+        )
+        return {
+            account: dict(balance=int(balance), boosted_balance=int(boosted))
+            for account, balance, boosted in rows
+        }
+
+    def claimed(self, pool: str, user: str) -> int:
+        row = self.db.execute(
+            "SELECT claimed FROM claims WHERE pool = ? AND user = ?",
+            (str(pool), str(user)),
+        ).fetchone()
+        return 0 if row is None else int(row[0])
+
+    def count_logs(self, event: Optional[str] = None) -> int:
+        if event is None:
+            return self.db.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        return self.db.execute(
+            "SELECT COUNT(*) FROM logs WHERE event = ?", (event,)
+        ).fetchone()[0]
+
+
+# primary key columns of the derived tables
+_KEYS: Dict[str, List[str]] = {
+    "locks": ["ve_yfi", "user"],
+    "claims": ["pool", "user"],
+    "pool_tokens": ["pool"],
+    "gauge_balances": ["gauge", "account"],
+}
@@ -0,0 +1,158 @@
+"""
+Find gauge stakers whose stored boost is above what their decaying veYFI lock
+still gives them and kick them in batches that fit a gas budget.
+
+The boosted balance a kick would store is computed off-chain, the same way as
+`Gauge._boostedBalanceOf`: gauge balances and stored boosted balances come from
+the indexer, veYFI balances and supply from the reference model rebuilt from the
+indexed lock events. Only the reward rate of the gauge is read on-chain.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+from ape import chain
+
+from veyfi.indexer import Indexer
+from veyfi.snapshot import build_model
+
+BOOSTING_FACTOR = 1
+BOOST_DENOMINATOR = 10
+
+
+@dataclass
+class Drift:
+    account: str
+    balance: int
+    # boosted balance stored by the gauge
+    stored: int
+    # boosted balance a kick would store
+    current: int
+    # rewards per second earned above the current boost
+    excess_rate: int
+
+    @property
+    def excess(self) -> int:
+        return self.stored - self.current
+
+
+def boosted_balance(
+    balance: int, gauge_supply: int, ve_balance: int, ve_supply: int
+) -> int:
+    """
+    `Gauge._boostedBalanceOf` of an account.
+    """
+    if ve_supply == 0:
+        return balance
+    return min(
+        (
+            balance * BOOSTING_FACTOR
+            + gauge_supply
+            * ve_balance
+            // ve_supply
+            * (BOOST_DENOMINATOR - BOOSTING_FACTOR)
+        )
+        // BOOST_DENOMINATOR,
+        balance,
+    )
+
+
+def scan(
+    indexer: Indexer, gauge, ve_yfi, ts: Optional[int] = None, min_excess: int = 1
+) -> List[Drift]:
+    """
+    Stakers of `gauge` whose stored boosted balance exceeds the current one by
+    at least `min_excess` at `ts`, the pending block timestamp by default.
+
+    :return: the drifts, largest excess reward rate first.
+    """
+    if ts is None:
+        ts = chain.pending_timestamp
+    stakers = indexer.gauge_stakers(gauge)
+    if not stakers:
+        return []
+
+    model, _ = build_model(indexer, ve_yfi, ve_yfi.point_history(ve_yfi, 0).ts)
+    accounts = list(stakers)
+    ve_balances = model.balances(accounts, [ts])[:, 0]
+    ve_supply = model.total_supply(ts)
+    gauge_supply = sum(staker["balance"] for staker in stakers.values())
+    reward_rate = gauge.rewardRate()
+
+    drifts = []
+    for account, ve_balance in zip(accounts, ve_balances):
+        staker = stakers[account]
+        current = boosted_balance(
+            staker["balance"], gauge_supply, int(ve_balance), ve_supply
+        )
+        excess = staker["boosted_balance"] - current
+        if excess < min_excess:
+            continue
+        drifts.append(
+            Drift(
+                account=account,
+                balance=staker["balance"],
+                stored=staker["boosted_balance"],
+                current=current,
+                excess_rate=excess * reward_rate // gauge_supply,
+            )
+        )
+    drifts.sort(key=lambda drift: (drift.excess_rate, drift.excess), reverse=True)
+    return drifts
+
+
+def estimate_kick_gas(gauge, accounts: List[str], sender) -> tuple:
+    """
+    Estimate the fixed and per-account gas of `Gauge.kick` from kicking one and
+    two of `accounts`.
+
+    :return: (base gas, gas per account)
+    """
+    one = gauge.kick.estimate_gas_cost(accounts[:1], sender=sender)
+    if len(accounts) < 2:
+        return one, one
+    two = gauge.kick.estimate_gas_cost(accounts[:2], sender=sender)
+    per_account = max(two - one, 1)
+    return max(one - per_account, 0), per_account
+
+
+def pack_kicks(
+    accounts: List[str], gas_budget: int, base_gas: int, gas_per_account: int
+) -> List[List[str]]:
+    """
+    Split `accounts` in order into batches whose estimated gas fits `gas_budget`.
+    """
+    size = max((gas_budget - base_gas) // gas_per_account, 1)
+    return [accounts[i : i + size] for i in range(0, len(accounts), size)]
+
+
+def kick(
+    gauge,
+    drifts: List[Drift],
+    sender,
+    gas_budget: int,
+    max_transactions: Optional[int] = None,
+) -> list:
+    """
+    Kick the accounts of `drifts` in order, in transactions of at most
+    `gas_budget` gas. Batches estimated above the budget are halved.
+
+    :return: the receipts.
+    """
+    accounts = [drift.account for drift in drifts]
+    if not accounts:
+        return []
+    base_gas, gas_per_account = estimate_kick_gas(gauge, accounts, sender)
+    batches = pack_kicks(accounts, gas_budget, base_gas, gas_per_account)
+
+    receipts = []
+    while batches and (max_transactions is None or len(receipts) < max_transactions):
+        batch = batches.pop(0)
+        gas = gauge.kick.estimate_gas_cost(batch, sender=sender)
+        if gas > gas_budget:
+            if len(batch) == 1:
+                raise ValueError(f"kicking {batch[0]} needs {gas} gas")
+            half = len(batch) // 2
+            batches[:0] = [batch[:half], batch[half:]]
+            continue
+        receipts.append(gauge.kick(batch, sender=sender, gas_limit=gas_budget))
+    return receipts
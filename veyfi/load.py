@@ -0,0 +1,402 @@
+"""
+Load generation for a local deployment of the whole veYFI system.
+
+Lockers join over the first half of the horizon with staggered lock ends, some
+past the 4 year kink. Every simulated week fees are burnt into the reward pool,
+dYFI is emitted to the gauges through the emission distributor, and a sample of
+lockers modify their locks, withdraw, claim and collect gauge rewards. The gas
+of every transaction is recorded with the week and the number of active locks,
+and operations are flagged when they come close to the block gas limit or to a
+fixed loop bound of the contracts.
+"""
+import random
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+from ape import accounts, chain, project
+from eth._utils.address import generate_contract_address
+from eth_utils import to_canonical_address, to_checksum_address
+
+from veyfi.distributor import distribute
+
+DAY = 86400
+WEEK = 7 * DAY
+MAX_LOCK_DURATION = 4 * 365 * DAY // WEEK * WEEK
+MAX_UINT256 = 2**256 - 1
+
+# loop bounds of the contracts
+TOKEN_CHECKPOINT_WEEKS = 40  # RewardPool._checkpoint_token
+SUPPLY_CHECKPOINT_WEEKS = 40  # RewardPool._checkpoint_total_supply
+CLAIM_WEEKS = 50  # RewardPool.claim default max_weeks
+GLOBAL_CHECKPOINT_WEEKS = 255  # VotingYFI.checkpoint
+REPLAY_WEEKS = 522  # VotingYFI MAX_N_WEEKS
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class Sample:
+    operation: str
+    week: int
+    population: int
+    gas: int
+
+
+@dataclass
+class Flag:
+    operation: str
+    week: int
+    reason: str
+
+
+class GasRecorder:
+    """
+    Gas of each operation as the population and the elapsed time grow.
+
+    :param block_gas_limit: gas limit of the blocks.
+    :param ratio: share of a limit from which an operation is flagged.
+    """
+
+    def __init__(self, block_gas_limit: int, ratio: float = 0.8):
+        self.block_gas_limit = block_gas_limit
+        self.ratio = ratio
+        self.samples: List[Sample] = []
+        self.flags: List[Flag] = []
+
+    def record(self, operation: str, receipt, week: int, population: int):
+        self.samples.append(Sample(operation, week, population, receipt.gas_used))
+        if receipt.gas_used >= self.block_gas_limit * self.ratio:
+            self.flag(
+                operation,
+                week,
+                f"used {receipt.gas_used} gas of a {self.block_gas_limit} block",
+            )
+        return receipt
+
+    def bound(self, operation: str, week: int, name: str, value: int, bound: int):
+        """
+        Flag `operation` when `value` reaches `ratio` of the loop `bound`.
+        """
+        if value >= bound * self.ratio:
+            self.flag(operation, week, f"{name} at {value} of {bound}")
+
+    def flag(self, operation: str, week: int, reason: str):
+        self.flags.append(Flag(operation, week, reason))
+
+    def percentiles(self, bucket_weeks: int = 52) -> List[dict]:
+        """
+        Gas percentiles of each operation over buckets of `bucket_weeks` weeks.
+        """
+        groups: Dict[tuple, List[Sample]] = {}
+        for sample in self.samples:
+            key = (sample.operation, sample.week // bucket_weeks)
+            groups.setdefault(key, []).append(sample)
+
+        rows = []
+        for (operation, bucket), samples in sorted(groups.items()):
+            gas = np.array([sample.gas for sample in samples])
+            row = {
+                "operation": operation,
+                "from_week": bucket * bucket_weeks,
+                "population": max(sample.population for sample in samples),
+                "count": len(samples),
+            }
+            for q in PERCENTILES:
+                row[f"p{q}"] = int(np.percentile(gas, q))
+            row["max"] = int(gas.max())
+            rows.append(row)
+        return rows
+
+    def to_dict(self, bucket_weeks: int = 52) -> dict:
+        return {
+            "block_gas_limit": self.block_gas_limit,
+            "percentiles": self.percentiles(bucket_weeks),
+            "flags": [asdict(flag) for flag in self.flags],
+            "samples": [asdict(sample) for sample in self.samples],
+        }
+
+
+def deploy_system(gov, gauges: int) -> SimpleNamespace:
+    """
+    Deploy YFI, veYFI with its reward pool, dYFI with its reward pool, the gauge
+    factory, the registry with `gauges` vault gauges and an emission distributor
+    that owns dYFI and weighs the gauges equally.
+    """
+    yfi = gov.deploy(project.Token, "YFI")
+    reward_pool_address = to_checksum_address(
+        generate_contract_address(to_canonical_address(str(gov)), gov.nonce + 1)
+    )
+    ve_yfi = gov.deploy(project.VotingYFI, yfi, reward_pool_address)
+    # the pools start a week later, fees sent before any lock would be lost
+    start_time = chain.pending_timestamp + WEEK
+    reward_pool = gov.deploy(project.RewardPool, ve_yfi, start_time)
+    assert str(reward_pool) == reward_pool_address, "broken setup"
+
+    d_yfi = gov.deploy(project.dYFI)
+    d_yfi_pool = gov.deploy(project.dYFIRewardPool, ve_yfi, d_yfi, start_time)
+    gauge = gov.deploy(project.Gauge, ve_yfi, d_yfi, d_yfi_pool)
+    gauge_factory = gov.deploy(project.GaugeFactory, gauge)
+    registry = gov.deploy(project.Registry, ve_yfi, yfi, gauge_factory, reward_pool)
+
+    vaults, gauge_contracts = [], []
+    for _ in range(gauges):
+        vault = gov.deploy(project.Token, "Yearn vault")
+        tx = registry.addVaultToRewards(vault, gov, sender=gov)
+        address = tx.decode_logs(gauge_factory.GaugeCreated)[0].gauge
+        vaults.append(vault)
+        gauge_contracts.append(project.Gauge.at(address))
+
+    distributor = gov.deploy(project.EmissionDistributor, d_yfi, registry)
+    distributor.setWeights(gauge_contracts, [1] * gauges, sender=gov)
+    d_yfi.transferOwnership(distributor, sender=gov)
+
+    return SimpleNamespace(
+        yfi=yfi,
+        ve_yfi=ve_yfi,
+        reward_pool=reward_pool,
+        d_yfi=d_yfi,
+        d_yfi_pool=d_yfi_pool,
+        gauge_factory=gauge_factory,
+        registry=registry,
+        vaults=vaults,
+        gauges=gauge_contracts,
+        distributor=distributor,
+    )
+
+
+@dataclass
+class Locker:
+    account: object
+    gauge: Optional[int] = None
+
+
+class LoadTest:
+    """
+    Simulate `weeks` weeks of a system with `lockers` lockers and `gauges`
+    gauges, recording the gas of every transaction in `recorder`.
+    """
+
+    def __init__(
+        self,
+        gov,
+        lockers: int,
+        gauges: int,
+        weeks: int,
+        actions_per_week: int = 50,
+        claims_per_week: int = 50,
+        kicks_per_week: int = 50,
+        stake_ratio: float = 0.5,
+        weekly_fees: int = 10**20,
+        weekly_emission: int = 10**21,
+        gas_budget: int = 10_000_000,
+        seed: int = 0,
+    ):
+        self.gov = gov
+        self.lockers = lockers
+        self.weeks = weeks
+        self.actions_per_week = actions_per_week
+        self.claims_per_week = claims_per_week
+        self.kicks_per_week = kicks_per_week
+        self.stake_ratio = stake_ratio
+        self.weekly_fees = weekly_fees
+        self.weekly_emission = weekly_emission
+        self.gas_budget = gas_budget
+        self.random = random.Random(seed)
+
+        self.system = deploy_system(gov, gauges)
+        self.recorder = GasRecorder(chain.blocks.head.gas_limit)
+        self.active: List[Locker] = []
+        self.week = 0
+
+    def run(self) -> GasRecorder:
+        s = self.system
+        s.yfi.mint(self.gov, self.weekly_fees * self.weeks, sender=self.gov)
+        s.yfi.approve(s.reward_pool, MAX_UINT256, sender=self.gov)
+
+        # everyone joins within the first half of the horizon
+        ramp_weeks = max(self.weeks // 2, 1)
+        joined = 0
+        for self.week in range(self.weeks):
+            target = min(self.lockers * (self.week + 1) // ramp_weeks, self.lockers)
+            for _ in range(target - joined):
+                self.join()
+            joined = target
+
+            self.checkpoints()
+            self.burn_fees()
+            self.emit()
+            for _ in range(self.actions_per_week):
+                if not self.active:
+                    break
+                self.act(self.random.choice(self.active))
+            for locker in self.random.sample(
+                self.active, min(self.claims_per_week, len(self.active))
+            ):
+                self.claim(locker)
+            self.kick()
+
+            chain.pending_timestamp += WEEK
+            chain.mine()
+        return self.recorder
+
+    # population
+
+    def record(self, operation: str, receipt):
+        return self.recorder.record(operation, receipt, self.week, len(self.active))
+
+    def unlock_time(self) -> int:
+        # staggered ends, a quarter of the locks past the 4 year kink
+        if self.random.random() < 0.25:
+            weeks = self.random.randint(MAX_LOCK_DURATION // WEEK + 1, 520)
+        else:
+            weeks = self.random.randint(1, MAX_LOCK_DURATION // WEEK)
+        return chain.pending_timestamp + weeks * WEEK
+
+    def join(self):
+        s = self.system
+        account = accounts.test_accounts.generate_test_account()
+        self.gov.transfer(account, 10**18)
+        amount = self.random.randint(1, 1000) * 10**18
+        s.yfi.mint(account, amount, sender=account)
+        s.yfi.approve(s.ve_yfi, MAX_UINT256, sender=account)
+        locker = Locker(account)
+        self.lock(locker, amount, self.unlock_time(), "VotingYFI.modify_lock (create)")
+
+        if self.random.random() < self.stake_ratio:
+            locker.gauge = self.random.randrange(len(s.gauges))
+            vault = s.vaults[locker.gauge]
+            gauge = s.gauges[locker.gauge]
+            vault.mint(account, amount, sender=account)
+            vault.approve(gauge, amount, sender=account)
+            self.record("Gauge.deposit", gauge.deposit(amount, sender=account))
+        self.active.append(locker)
+
+    def lock(self, locker: Locker, amount: int, unlock_time: int, operation: str):
+        self.record(
+            operation,
+            self.system.ve_yfi.modify_lock(amount, unlock_time, sender=locker.account),
+        )
+
+    def act(self, locker: Locker):
+        s = self.system
+        lock = s.ve_yfi.locked(locker.account)
+        if lock.end <= chain.pending_timestamp or self.random.random() < 0.1:
+            self.record("VotingYFI.withdraw", s.ve_yfi.withdraw(sender=locker.account))
+            if locker.gauge is not None:
+                gauge = s.gauges[locker.gauge]
+                self.record(
+                    "Gauge.withdraw",
+                    gauge.withdraw(True, sender=locker.account),
+                )
+            self.active.remove(locker)
+            return
+
+        unlock_time = max(lock.end + WEEK, self.unlock_time())
+        # locks end at most 521 weeks from now
+        latest = chain.pending_timestamp // WEEK * WEEK + (REPLAY_WEEKS - 1) * WEEK
+        if self.random.random() < 0.5 or unlock_time >= latest:
+            s.yfi.mint(locker.account, 10**18, sender=locker.account)
+            self.lock(locker, 10**18, 0, "VotingYFI.modify_lock (increase)")
+        else:
+            self.lock(locker, 0, unlock_time, "VotingYFI.modify_lock (extend)")
+
+    # weekly operations
+
+    def checkpoints(self):
+        s = self.system
+        self.recorder.bound(
+            "VotingYFI.checkpoint",
+            self.week,
+            "pending weeks",
+            s.ve_yfi.pending_weeks(),
+            GLOBAL_CHECKPOINT_WEEKS,
+        )
+        self.record("VotingYFI.checkpoint", s.ve_yfi.checkpoint(sender=self.gov))
+        for name, pool in (
+            ("RewardPool", s.reward_pool),
+            ("dYFIRewardPool", s.d_yfi_pool),
+        ):
+            weeks = (
+                chain.pending_timestamp // WEEK * WEEK - pool.time_cursor()
+            ) // WEEK
+            self.recorder.bound(
+                f"{name}.checkpoint_total_supply",
+                self.week,
+                "weeks behind",
+                weeks + 1,
+                SUPPLY_CHECKPOINT_WEEKS,
+            )
+            self.record(
+                f"{name}.checkpoint_total_supply",
+                pool.checkpoint_total_supply(sender=self.gov),
+            )
+
+    def burn_fees(self):
+        s = self.system
+        weeks = (chain.pending_timestamp - s.reward_pool.last_token_time()) // WEEK
+        self.recorder.bound(
+            "RewardPool.burn",
+            self.week,
+            "token checkpoint weeks",
+            weeks + 1,
+            TOKEN_CHECKPOINT_WEEKS,
+        )
+        self.record(
+            "RewardPool.burn", s.reward_pool.burn(self.weekly_fees, sender=self.gov)
+        )
+
+    def emit(self):
+        s = self.system
+        receipts = distribute(
+            s.distributor, self.gov, self.gas_budget, self.weekly_emission
+        )
+        self.record("EmissionDistributor.startRound", receipts[0])
+        for receipt in receipts[1:]:
+            self.record("EmissionDistributor.distribute", receipt)
+
+    def claim(self, locker: Locker):
+        s = self.system
+        account = locker.account
+        epoch = s.ve_yfi.epoch(account)
+        last_point = s.ve_yfi.point_history(account, epoch)
+        self.recorder.bound(
+            "VotingYFI.balanceOf",
+            self.week,
+            "weeks since the last point",
+            (chain.pending_timestamp - last_point.ts) // WEEK,
+            REPLAY_WEEKS,
+        )
+        for name, pool in (
+            ("RewardPool", s.reward_pool),
+            ("dYFIRewardPool", s.d_yfi_pool),
+        ):
+            cursor = pool.time_cursor_of(account)
+            if cursor == 0:
+                # a first claim starts from the week after the first lock
+                first_point = s.ve_yfi.point_history(account, 1)
+                cursor = max(
+                    (first_point.ts + WEEK - 1) // WEEK * WEEK, pool.start_time()
+                )
+            self.recorder.bound(
+                f"{name}.claim",
+                self.week,
+                "unclaimed weeks",
+                (chain.pending_timestamp - cursor) // WEEK,
+                CLAIM_WEEKS,
+            )
+            self.record(f"{name}.claim", pool.claim(sender=account))
+        if locker.gauge is not None:
+            gauge = s.gauges[locker.gauge]
+            self.record("Gauge.getReward", gauge.getReward(sender=account))
+
+    def kick(self):
+        # refresh the boosts of the stakers of a gauge in one transaction
+        s = self.system
+        index = self.random.randrange(len(s.gauges))
+        stakers = [locker.account for locker in self.active if locker.gauge == index][
+            : self.kicks_per_week
+        ]
+        if stakers:
+            self.record("Gauge.kick", s.gauges[index].kick(stakers, sender=self.gov))
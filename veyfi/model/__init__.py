@@ -0,0 +1,37 @@
+"""
+Reference models of the VotingYFI and RewardPool accounting.
+
+The model replays the same actions as the contract and reproduces its
+results exactly, which makes it usable as a differential oracle in tests.
+"""
+from veyfi.model.reward_pool import RewardPoolModel
+from veyfi.model.voting_yfi import (
+    DAY,
+    GLOBAL,
+    MAX_LOCK_DURATION,
+    MAX_N_WEEKS,
+    MAX_PENALTY_RATIO,
+    SCALE,
+    WEEK,
+    LockedBalance,
+    Point,
+    Revert,
+    VotingYFIModel,
+    round_to_week,
+)
+
+__all__ = [
+    "DAY",
+    "GLOBAL",
+    "MAX_LOCK_DURATION",
+    "MAX_N_WEEKS",
+    "MAX_PENALTY_RATIO",
+    "SCALE",
+    "WEEK",
+    "LockedBalance",
+    "Point",
+    "Revert",
+    "RewardPoolModel",
+    "VotingYFIModel",
+    "round_to_week",
+]
@@ -0,0 +1,179 @@
+"""
+Pure-Python model of contracts/RewardPool.vy, on top of `VotingYFIModel`.
+
+Token and supply checkpoints and claims are replayed with the same integer
+arithmetic and loop bounds as the contract, so fees lost to the 40 week limits
+of the checkpoints or claimed late are reproduced too. Claims never relock.
+The same model covers dYFIRewardPool, whose accounting is identical.
+"""
+from typing import Dict, Hashable, Tuple
+
+from veyfi.model.voting_yfi import (
+    DAY,
+    WEEK,
+    Point,
+    VotingYFIModel,
+    _require,
+    round_to_week,
+)
+
+TOKEN_CHECKPOINT_DEADLINE = DAY
+MAX_CLAIM_WEEKS = 500
+CHECKPOINT_WEEKS = 40
+
+
+class RewardPoolModel:
+    """
+    Replays RewardPool actions in timestamp order. VotingYFI actions are
+    replayed on `ve` directly, and a withdrawal penalty must be followed by
+    `burn` of the penalty, as `VotingYFI.withdraw` does.
+
+    :param ve: model of the VotingYFI the pool reads.
+    :param start_time: `start_time` the pool was deployed with.
+    """
+
+    def __init__(self, ve: VotingYFIModel, start_time: int):
+        self.ve = ve
+        self.start_time = round_to_week(start_time)
+        self.time_cursor = self.start_time
+        self.last_token_time = self.start_time
+        self.time_cursor_of: Dict[Hashable, int] = {}
+        self.tokens_per_week: Dict[int, int] = {}
+        self.ve_supply: Dict[int, int] = {}
+        self.token_last_balance = 0
+        # token balance of the pool
+        self.balance = 0
+
+    # actions
+
+    def burn(self, amount: int, ts: int):
+        """
+        Receive `amount` tokens at `ts`, as `RewardPool.burn`.
+        """
+        if amount > 0:
+            self.balance += amount
+            if ts > self.last_token_time + TOKEN_CHECKPOINT_DEADLINE:
+                self._checkpoint_token(ts)
+
+    def checkpoint_token(self, ts: int):
+        _require(
+            ts > self.last_token_time + TOKEN_CHECKPOINT_DEADLINE,
+            "token checkpoint too early",
+        )
+        self._checkpoint_token(ts)
+
+    def checkpoint_total_supply(self, ts: int):
+        t = self.time_cursor
+        rounded_timestamp = round_to_week(ts)
+        self.ve.checkpoint(ts)
+        for _ in range(CHECKPOINT_WEEKS):
+            if t > rounded_timestamp:
+                break
+            self.ve_supply[t] = self.ve.weekly_supply.get(t, 0)
+            t += WEEK
+        self.time_cursor = t
+
+    def claim(self, user: Hashable, ts: int, max_weeks: int = 50) -> int:
+        """
+        Claim the fees of `user` at `ts`, as `RewardPool.claim`.
+
+        :return: the amount sent to the user.
+        """
+        last_token_time = self._checkpoint_for_claim(ts)
+        amount, start_cursor, week_cursor = self._claimable(
+            user, last_token_time, max_weeks
+        )
+        if week_cursor == start_cursor:
+            return 0
+        self.time_cursor_of[user] = week_cursor
+        self.balance -= amount
+        self.token_last_balance -= amount
+        return amount
+
+    # internals
+
+    def _checkpoint_token(self, ts: int):
+        to_distribute = self.balance - self.token_last_balance
+        if to_distribute == 0:
+            self.last_token_time = ts
+            return
+
+        self.token_last_balance = self.balance
+        t = self.last_token_time
+        since_last = ts - t
+        self.last_token_time = ts
+        this_week = round_to_week(t)
+        for _ in range(CHECKPOINT_WEEKS):
+            next_week = this_week + WEEK
+            if ts < next_week:
+                if since_last == 0 and ts == t:
+                    share = to_distribute
+                else:
+                    share = to_distribute * (ts - t) // since_last
+                self._add_tokens(this_week, share)
+                break
+            if since_last == 0 and next_week == t:
+                share = to_distribute
+            else:
+                share = to_distribute * (next_week - t) // since_last
+            self._add_tokens(this_week, share)
+            t = next_week
+            this_week = next_week
+
+    def _add_tokens(self, week: int, amount: int):
+        self.tokens_per_week[week] = self.tokens_per_week.get(week, 0) + amount
+
+    def _checkpoint_for_claim(self, ts: int) -> int:
+        if ts >= self.time_cursor:
+            self.checkpoint_total_supply(ts)
+        last_token_time = self.last_token_time
+        if ts > last_token_time + TOKEN_CHECKPOINT_DEADLINE:
+            self._checkpoint_token(ts)
+            last_token_time = ts
+        return round_to_week(last_token_time)
+
+    def _user_point(self, user: Hashable, ts: int, max_epoch: int) -> Tuple[Point, int]:
+        epoch = self.ve.find_epoch_by_timestamp(user, ts)
+        next_epoch_time = 2**256 - 1
+        if epoch < max_epoch:
+            next_epoch_time = self.ve.point_history(user, epoch + 1).ts
+        return self.ve.point_at(user, ts), next_epoch_time
+
+    def _claimable(
+        self, user: Hashable, last_token_time: int, max_weeks: int
+    ) -> Tuple[int, int, int]:
+        max_epoch = self.ve.epoch(user)
+        week_cursor = self.time_cursor_of.get(user, 0)
+        if max_epoch == 0:
+            return 0, week_cursor, week_cursor
+        if week_cursor == 0:
+            first_point = self.ve.point_history(user, 1)
+            week_cursor = (first_point.ts + WEEK - 1) // WEEK * WEEK
+        start_cursor = week_cursor
+        if week_cursor >= last_token_time:
+            return 0, start_cursor, week_cursor
+        week_cursor = max(week_cursor, self.start_time)
+
+        to_distribute = 0
+        point, next_epoch_time = self._user_point(user, week_cursor, max_epoch)
+        for i in range(MAX_CLAIM_WEEKS):
+            if i >= max_weeks or week_cursor >= last_token_time:
+                break
+            if week_cursor >= next_epoch_time:
+                point, next_epoch_time = self._user_point(user, week_cursor, max_epoch)
+            elif week_cursor > point.ts:
+                point.bias -= point.slope * (week_cursor - point.ts)
+                point.slope += self.ve.slope_change(user, week_cursor)
+                point.ts = week_cursor
+            balance = max(point.bias, 0)
+            if balance == 0:
+                break
+            # weeks past the supply checkpoint have no recorded supply
+            ve_supply = self.ve_supply.get(week_cursor, 0)
+            _require(ve_supply != 0, "division by zero")
+            to_distribute += (
+                balance * self.tokens_per_week.get(week_cursor, 0) // ve_supply
+            )
+            week_cursor += WEEK
+
+        return to_distribute, start_cursor, week_cursor
@@ -0,0 +1,464 @@
+"""
+Pure-Python model of contracts/VotingYFI.vy.
+
+Actions (`modify_lock`, `withdraw`, `checkpoint`) are replayed with the same
+integer arithmetic as the contract, including week rounding, the kink of locks
+longer than `MAX_LOCK_DURATION`, the `MAX_N_WEEKS` replay cap and the early exit
+penalty. Balances are then evaluated with NumPy for every (account, timestamp)
+pair of a grid in one pass.
+
+Block numbers are not modelled, so `getPriorVotes` and `totalSupplyAt` have no
+counterpart here.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DAY = 86400
+WEEK = 7 * DAY
+MAX_LOCK_DURATION = 4 * 365 * DAY // WEEK * WEEK
+SCALE = 10**18
+MAX_PENALTY_RATIO = SCALE * 3 // 4
+MAX_N_WEEKS = 522
+MIN_LOCK_AMOUNT = 10**18
+GLOBAL_CHECKPOINT_WEEKS = 255
+
+# account holding the global points and slope changes, `self` in the contract
+GLOBAL = "global"
+
+# timestamps fit in 40 bits, accounts are keyed by `index * KEY_SPAN + ts`
+KEY_SPAN = 2**40
+
+
+class Revert(Exception):
+    """
+    Raised where the contract would revert.
+    """
+
+
+@dataclass
+class Point:
+    bias: int = 0
+    slope: int = 0
+    ts: int = 0
+
+
+@dataclass
+class LockedBalance:
+    amount: int = 0
+    end: int = 0
+
+
+def round_to_week(ts: int) -> int:
+    return ts // WEEK * WEEK
+
+
+def _require(condition: bool, reason: str):
+    if not condition:
+        raise Revert(reason)
+
+
+class VotingYFIModel:
+    """
+    Replays VotingYFI actions in timestamp order.
+
+    :param deployed_at: timestamp of the contract deployment, the time of the
+        first global point.
+    """
+
+    def __init__(self, deployed_at: int):
+        self.now = deployed_at
+        self.supply = 0
+        self.locked: Dict[Hashable, LockedBalance] = {}
+        self.points: Dict[Hashable, List[Point]] = {GLOBAL: [Point(ts=deployed_at)]}
+        self.slope_changes: Dict[Hashable, Dict[int, int]] = {GLOBAL: {}}
+        self.weekly_supply: Dict[int, int] = {}
+        self._arrays = None
+
+    # actions
+
+    def modify_lock(
+        self,
+        user: Hashable,
+        amount: int,
+        unlock_time: int,
+        ts: int,
+        sender: Optional[Hashable] = None,
+    ) -> LockedBalance:
+        """
+        Create or modify the lock of `user` at `ts`, as `VotingYFI.modify_lock`.
+        """
+        sender = user if sender is None else sender
+        self._advance(ts)
+        old_lock = self.locked.get(user, LockedBalance())
+        new_lock = LockedBalance(old_lock.amount + amount, old_lock.end)
+
+        unlock_week = 0
+        if sender == user and unlock_time != 0:
+            unlock_week = round_to_week(unlock_time)
+            _require(unlock_week >= round_to_week(ts), "unlock time in the past")
+            _require(
+                (unlock_week - round_to_week(ts)) // WEEK < MAX_N_WEEKS,
+                "lock can't exceed 10 years",
+            )
+            _require(unlock_week > ts, "unlock time must be in the future")
+            if unlock_week - ts < MAX_LOCK_DURATION:
+                _require(unlock_week > old_lock.end, "can only increase lock duration")
+            else:
+                _require(
+                    unlock_week > ts + MAX_LOCK_DURATION,
+                    "can only decrease to ≥4 years",
+                )
+            new_lock.end = unlock_week
+
+        if old_lock.amount == 0 and old_lock.end == 0:
+            _require(sender == user, "you can only create a lock for yourself")
+            _require(amount >= MIN_LOCK_AMOUNT, "minimum amount is 1 YFI")
+            _require(unlock_week != 0, "must specify unlock time in the future")
+        else:
+            _require(old_lock.end > ts, "lock expired")
+
+        self.supply += amount
+        self.locked[user] = new_lock
+        self._checkpoint(user, old_lock, new_lock, ts)
+        return replace(new_lock)
+
+    def withdraw(self, user: Hashable, ts: int) -> Tuple[int, int]:
+        """
+        Withdraw the lock of `user` at `ts`, as `VotingYFI.withdraw`.
+
+        :return: the amount sent to the user and the penalty.
+        """
+        self._advance(ts)
+        old_lock = self.locked.get(user, LockedBalance())
+        _require(old_lock.amount > 0, "create a lock first to withdraw")
+        penalty = self.penalty(user, ts)
+
+        zero_lock = LockedBalance()
+        self.locked[user] = zero_lock
+        self.supply -= old_lock.amount
+        self._checkpoint(user, old_lock, zero_lock, ts)
+        return old_lock.amount - penalty, penalty
+
+    def checkpoint(self, ts: int, max_weeks: int = GLOBAL_CHECKPOINT_WEEKS):
+        """
+        Record the global point at `ts`, as `VotingYFI.checkpoint`.
+        """
+        self._advance(ts)
+        if self.pending_weeks(ts) > max_weeks:
+            self._checkpoint_global(ts, max_weeks)
+        else:
+            self._checkpoint(None, LockedBalance(), LockedBalance(), ts)
+
+    # views
+
+    def penalty(self, user: Hashable, ts: int) -> int:
+        """
+        Early exit penalty of `user` withdrawing at `ts`.
+        """
+        lock = self.locked.get(user, LockedBalance())
+        if lock.end <= ts:
+            return 0
+        time_left = min(lock.end - ts, MAX_LOCK_DURATION)
+        penalty_ratio = min(time_left * SCALE // MAX_LOCK_DURATION, MAX_PENALTY_RATIO)
+        return lock.amount * penalty_ratio // SCALE
+
+    def epoch(self, account: Hashable) -> int:
+        return len(self.points.get(account, [Point()])) - 1
+
+    def point_history(self, account: Hashable, epoch: int) -> Point:
+        points = self.points.get(account, [])
+        return replace(points[epoch]) if epoch < len(points) else Point()
+
+    def slope_change(self, account: Hashable, ts: int) -> int:
+        return self.slope_changes.get(account, {}).get(ts, 0)
+
+    def find_epoch_by_timestamp(self, account: Hashable, ts: int) -> int:
+        points = self.points.get(account, [Point()])
+        return max(bisect_right([point.ts for point in points], ts) - 1, 0)
+
+    def point_at(self, account: Hashable, ts: int) -> Point:
+        """
+        Point of `account` carried forward to `ts`, as `VotingYFI.point_at`: the
+        bias is floored at 0 and the slope includes the change scheduled at `ts`.
+        """
+        if self.epoch(account) == 0:
+            return Point()
+        point = self.points[account][self.find_epoch_by_timestamp(account, ts)]
+
+        start = round_to_week(point.ts)
+        bias, slope = point.bias, point.slope
+        if ts < start + WEEK:
+            bias -= slope * (ts - point.ts)
+        else:
+            t_max = min(ts, start + MAX_N_WEEKS * WEEK)
+            t = point.ts
+            for week, d_slope in sorted(self.slope_changes.get(account, {}).items()):
+                if start < week < t_max:
+                    bias -= slope * (week - t)
+                    slope += d_slope
+                    t = week
+            bias -= slope * (t_max - t)
+
+        if ts > point.ts and ts % WEEK == 0:
+            slope += self.slope_change(account, ts)
+        return Point(max(bias, 0), slope, ts)
+
+    def pending_weeks(self, ts: int) -> int:
+        epoch = self.epoch(GLOBAL)
+        if epoch == 0:
+            return 0
+        last_checkpoint = self.points[GLOBAL][epoch].ts
+        if ts <= last_checkpoint:
+            return 0
+        return (ts - 1) // WEEK - last_checkpoint // WEEK
+
+    def balance_of(self, user: Hashable, ts: int) -> int:
+        return int(self.balances([user], [ts])[0, 0])
+
+    def total_supply(self, ts: int) -> int:
+        return int(self.balances([GLOBAL], [ts])[0, 0])
+
+    def total_supply_many(self, timestamps: Sequence[int]) -> np.ndarray:
+        return self.balances([GLOBAL], timestamps)[0]
+
+    def balances(
+        self, accounts: Sequence[Hashable], timestamps: Sequence[int]
+    ) -> np.ndarray:
+        """
+        Voting power of every account at every timestamp.
+
+        For each pair, the last point of the account at or before the timestamp
+        is carried forward with the slope changes scheduled in between, found by
+        binary search over all accounts at once. Timestamps before the first
+        point of an account read 0.
+
+        :return: object array of Python ints, one row per account.
+        """
+        arrays = self._get_arrays()
+        index = arrays["index"]
+        account_idx = np.array([index.get(a, -1) for a in accounts], dtype=np.int64)
+        times = np.asarray(timestamps, dtype=np.int64)
+        a = np.repeat(account_idx, len(times))
+        t = np.tile(times, len(account_idx))
+
+        p = np.searchsorted(arrays["p_key"], a * KEY_SPAN + t, side="right") - 1
+        valid = p >= 0
+        p = np.where(valid, p, 0)
+        valid &= arrays["p_account"][p] == a
+
+        bias = self._carry(arrays, a, p, t)
+        bias = np.where(valid, bias, 0)
+        return bias.reshape(len(account_idx), len(times))
+
+    def balances_at_epochs(
+        self,
+        accounts: Sequence[Hashable],
+        epochs: Sequence[int],
+        timestamps: Sequence[int],
+    ) -> np.ndarray:
+        """
+        Voting power of each account at the matching timestamp, carried from
+        the point at the matching epoch, as `getPriorVotes` does once it found
+        the epoch of the block.
+
+        :return: object array of Python ints, one entry per account.
+        """
+        arrays = self._get_arrays()
+        index = arrays["index"]
+        a = np.array([index.get(account, -1) for account in accounts], dtype=np.int64)
+        e = np.asarray(epochs, dtype=np.int64)
+        t = np.asarray(timestamps, dtype=np.int64)
+
+        known = a >= 0
+        first = arrays["p_first"][np.where(known, a, 0)]
+        count = arrays["p_first"][np.where(known, a, 0) + 1] - first
+        valid = known & (e >= 0) & (e < count)
+        p = np.where(valid, first + e, 0)
+
+        bias = self._carry(arrays, a, p, t)
+        return np.where(valid, bias, 0)
+
+    # internals
+
+    def _carry(
+        self, arrays: dict, a: np.ndarray, p: np.ndarray, t: np.ndarray
+    ) -> np.ndarray:
+        """
+        Carry the points at indices `p` of accounts `a` forward to `t`, with the
+        slope changes scheduled in between and the `MAX_N_WEEKS` cap of the
+        contract replay.
+        """
+        point_ts = arrays["p_ts"][p]
+        start = point_ts // WEEK * WEEK
+        t_end = np.minimum(t, start + MAX_N_WEEKS * WEEK)
+        # slope changes strictly after the week of the point and before `t_end`
+        lo = np.searchsorted(arrays["c_key"], a * KEY_SPAN + start, side="right")
+        hi = np.searchsorted(arrays["c_key"], a * KEY_SPAN + t_end, side="left")
+        d_slope = arrays["c_slope"][hi] - arrays["c_slope"][lo]
+        d_slope_ts = arrays["c_slope_ts"][hi] - arrays["c_slope_ts"][lo]
+
+        t_end = t_end.astype(object)
+        bias = (
+            arrays["p_bias"][p]
+            - arrays["p_slope"][p] * (t_end - point_ts.astype(object))
+            - (t_end * d_slope - d_slope_ts)
+        )
+        return np.maximum(bias, 0)
+
+    def _advance(self, ts: int):
+        _require(ts >= self.now, "actions must be replayed in timestamp order")
+        self.now = ts
+        self._arrays = None
+
+    def _lock_to_point(self, lock: LockedBalance, ts: int) -> Point:
+        point = Point(ts=ts)
+        if lock.amount > 0:
+            slope = lock.amount // MAX_LOCK_DURATION
+            if lock.end > ts + MAX_LOCK_DURATION:
+                point.bias = slope * MAX_LOCK_DURATION
+            elif lock.end > ts:
+                point.slope = slope
+                point.bias = slope * (lock.end - ts)
+        return point
+
+    def _lock_to_kink(self, lock: LockedBalance, ts: int) -> Tuple[int, int]:
+        if lock.amount > 0 and lock.end > round_to_week(ts + MAX_LOCK_DURATION):
+            return (
+                lock.amount // MAX_LOCK_DURATION,
+                round_to_week(lock.end - MAX_LOCK_DURATION),
+            )
+        return 0, 0
+
+    def _schedule_slope_change(self, user: Hashable, ts: int, d_slope: int):
+        for account in (GLOBAL, user):
+            changes = self.slope_changes.setdefault(account, {})
+            changes[ts] = changes.get(ts, 0) + d_slope
+
+    def _record_point(self, account: Hashable, epoch: int, point: Point):
+        points = self.points.setdefault(account, [Point()])
+        if epoch == len(points):
+            points.append(replace(point))
+        else:
+            points[epoch] = replace(point)
+
+    def _checkpoint_user(
+        self, user: Hashable, old_lock: LockedBalance, new_lock: LockedBalance, ts: int
+    ) -> Tuple[Point, Point]:
+        old_point = self._lock_to_point(old_lock, ts)
+        new_point = self._lock_to_point(new_lock, ts)
+        old_kink_slope, old_kink_ts = self._lock_to_kink(old_lock, ts)
+        new_kink_slope, new_kink_ts = self._lock_to_kink(new_lock, ts)
+
+        if old_point.slope != 0 and old_lock.end > ts:
+            self._schedule_slope_change(user, old_lock.end, old_point.slope)
+        if new_point.slope != 0 and new_lock.end > ts:
+            self._schedule_slope_change(user, new_lock.end, -new_point.slope)
+
+        if old_kink_slope != 0:
+            self._schedule_slope_change(user, old_kink_ts, -old_kink_slope)
+            self._schedule_slope_change(user, old_lock.end, old_kink_slope)
+        if new_kink_slope != 0:
+            self._schedule_slope_change(user, new_kink_ts, new_kink_slope)
+            self._schedule_slope_change(user, new_lock.end, -new_kink_slope)
+
+        self._record_point(user, self.epoch(user) + 1, new_point)
+        return old_point, new_point
+
+    def _checkpoint_global(self, ts: int, max_weeks: int) -> Point:
+        points = self.points[GLOBAL]
+        epoch = len(points) - 1
+        last_point = Point(ts=ts)
+        if epoch > 0:
+            last_point = replace(points[epoch])
+        last_checkpoint = last_point.ts
+
+        t_i = round_to_week(last_checkpoint)
+        for i in range(GLOBAL_CHECKPOINT_WEEKS):
+            t_i = min(t_i + WEEK, ts)
+            if i == max_weeks and t_i < ts:
+                break
+            last_point.bias -= last_point.slope * (t_i - last_checkpoint)
+            last_point.slope += self.slope_change(GLOBAL, t_i)
+            last_point.bias = max(0, last_point.bias)
+            last_point.slope = max(0, last_point.slope)
+            last_checkpoint = t_i
+            last_point.ts = t_i
+            epoch += 1
+            if t_i < ts:
+                self._record_point(GLOBAL, epoch, last_point)
+                self.weekly_supply[t_i] = last_point.bias
+            else:
+                # `_checkpoint` adds the changes of the user to this point
+                self._record_point(GLOBAL, epoch, last_point)
+                break
+
+        return last_point
+
+    def _checkpoint(
+        self,
+        user: Optional[Hashable],
+        old_lock: LockedBalance,
+        new_lock: LockedBalance,
+        ts: int,
+    ):
+        if user is not None:
+            old_point, new_point = self._checkpoint_user(user, old_lock, new_lock, ts)
+
+        last_point = self._checkpoint_global(ts, GLOBAL_CHECKPOINT_WEEKS)
+        if user is not None:
+            last_point.slope += new_point.slope - old_point.slope
+            last_point.bias += new_point.bias - old_point.bias
+            last_point.slope = max(0, last_point.slope)
+            last_point.bias = max(0, last_point.bias)
+
+        self._record_point(GLOBAL, self.epoch(GLOBAL), last_point)
+        if last_point.ts % WEEK == 0:
+            self.weekly_supply[last_point.ts] = last_point.bias
+
+    def _get_arrays(self) -> dict:
+        """
+        Flatten the points and slope changes of all accounts into arrays sorted
+        by `account index * KEY_SPAN + ts`.
+        """
+        if self._arrays is not None:
+            return self._arrays
+
+        index = {account: i for i, account in enumerate(self.points)}
+        p_key, p_account, p_ts, p_bias, p_slope = [], [], [], [], []
+        p_first = []
+        c_key, c_slope, c_slope_ts = [], [], []
+        for account, i in index.items():
+            p_first.append(len(p_key))
+            for point in self.points[account]:
+                p_key.append(i * KEY_SPAN + point.ts)
+                p_account.append(i)
+                p_ts.append(point.ts)
+                p_bias.append(point.bias)
+                p_slope.append(point.slope)
+            for ts, d_slope in sorted(self.slope_changes.get(account, {}).items()):
+                if d_slope != 0:
+                    c_key.append(i * KEY_SPAN + ts)
+                    c_slope.append(d_slope)
+                    c_slope_ts.append(d_slope * ts)
+
+        def prefix_sum(values: list) -> np.ndarray:
+            sums = np.zeros(len(values) + 1, dtype=object)
+            sums[1:] = np.cumsum(np.array(values, dtype=object))
+            return sums
+
+        self._arrays = {
+            "index": index,
+            "p_key": np.array(p_key, dtype=np.int64),
+            "p_first": np.array(p_first + [len(p_key)], dtype=np.int64),
+            "p_account": np.array(p_account, dtype=np.int64),
+            "p_ts": np.array(p_ts, dtype=np.int64),
+            "p_bias": np.array(p_bias, dtype=object),
+            "p_slope": np.array(p_slope, dtype=object),
+            "c_key": np.array(c_key, dtype=np.int64),
+            "c_slope": prefix_sum(c_slope),
+            "c_slope_ts": prefix_sum(c_slope_ts),
+        }
+        return self._arrays
@@ -0,0 +1,256 @@
+"""
+Opcode-level gas profile of a transaction, from the `debug_traceTransaction`
+struct logs of the provider.
+
+Gas is attributed to the stack of external calls that spent it, each call named
+after the contract and function its calldata selects, and to the source line of
+the opcode when the compiler emitted a pc map. A call opcode is only charged for
+what its callee didn't spend. Storage reads and writes are counted per function
+along with whether they hit a slot cold or warm (EIP-2929), and so are the
+external calls each function makes.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ape import chain
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+from hexbytes import HexBytes
+
+CALL_OPS = {"CALL", "CALLCODE", "STATICCALL", "DELEGATECALL"}
+CREATE_OPS = {"CREATE", "CREATE2"}
+# calls that run the code of the callee on the storage of the caller
+CODE_ONLY_CALL_OPS = {"CALLCODE", "DELEGATECALL"}
+
+
+@dataclass
+class FunctionStats:
+    gas: int = 0
+    sloads: int = 0
+    sstores: int = 0
+    cold: int = 0
+    warm: int = 0
+    calls: int = 0
+
+
+@dataclass
+class Profile:
+    # gas of each contract function, without its external calls
+    functions: Dict[str, FunctionStats] = field(default_factory=dict)
+    # gas of each stack of calls and source line
+    stacks: Dict[Tuple[str, ...], int] = field(default_factory=dict)
+
+    @property
+    def gas(self) -> int:
+        return sum(self.stacks.values())
+
+
+@dataclass
+class _Context:
+    stack: Tuple[str, ...]
+    storage: str
+    code: Optional[object]
+    pcmap: Dict[int, object]
+    depth: int = 0
+    # gas spent at this depth, callees included
+    gas: int = 0
+    # stack the call opcode that entered this context was charged to
+    call_key: Tuple[str, ...] = ()
+
+
+def _int(value) -> int:
+    if isinstance(value, int):
+        return value
+    return int(HexBytes(value).hex(), 16)
+
+
+def _address(value) -> str:
+    return to_checksum_address(_int(value).to_bytes(32, "big")[-20:])
+
+
+def _memory(raw: dict) -> bytes:
+    memory = raw.get("memory") or []
+    if isinstance(memory, dict):
+        memory = memory.get("__root__", [])
+    return b"".join(bytes(HexBytes(word)) for word in memory)
+
+
+def _calldata(op: str, raw: dict) -> bytes:
+    stack = raw.get("stack") or []
+    offset, size = (
+        (stack[-4], stack[-5]) if op in {"CALL", "CALLCODE"} else stack[-3:-5:-1]
+    )
+    offset, size = _int(offset), _int(size)
+    return _memory(raw)[offset : offset + min(size, 4)]
+
+
+def _contract_type(address: Optional[str]):
+    if address is None:
+        return None
+    try:
+        return chain.contracts.get(address)
+    except Exception:
+        # not a contract known to ape, e.g. a precompile
+        return None
+
+
+def _label(contract_type, address: Optional[str], calldata: Optional[bytes]) -> str:
+    name = contract_type.name if contract_type else (address or "unknown")[:10]
+    if calldata is None:
+        return f"{name}.constructor"
+    if len(calldata) < 4:
+        return f"{name}.fallback"
+    if contract_type:
+        for abi in contract_type.methods:
+            if function_signature_to_4byte_selector(abi.selector) == calldata[:4]:
+                return f"{name}.{abi.name}"
+    return f"{name}.{calldata[:4].hex()}"
+
+
+def _pcmap(contract_type, address: Optional[str]) -> Dict[int, object]:
+    if contract_type is None or contract_type.pcmap is None or address is None:
+        return {}
+    # ape resolves proxies, like the gauge clones, to their implementation
+    runtime = contract_type.runtime_bytecode
+    code = chain.provider.get_code(address)
+    if runtime is None or len(HexBytes(runtime.bytecode or "")) != len(code):
+        return {}
+    return contract_type.pcmap.parse()
+
+
+def _context(stack, storage, code_address, calldata, call_key=()):
+    contract_type = _contract_type(code_address)
+    return _Context(
+        stack=stack + (_label(contract_type, code_address, calldata),),
+        storage=storage,
+        code=contract_type,
+        pcmap=_pcmap(contract_type, code_address),
+        call_key=call_key,
+    )
+
+
+def _op_gas(frames: List) -> List[int]:
+    """
+    Gas of each opcode: the drop in remaining gas until the next opcode at the
+    same depth. For a call opcode that includes everything its callee spent.
+    """
+    gas = [frame.gas_cost for frame in frames]
+    previous = {}
+    for i, frame in enumerate(frames):
+        for depth in [depth for depth in previous if depth > frame.depth]:
+            del previous[depth]
+        if frame.depth in previous:
+            j = previous[frame.depth]
+            gas[j] = frames[j].gas - frame.gas
+        previous[frame.depth] = i
+    return gas
+
+
+def profile_trace(frames: List, receiver: str, calldata: bytes) -> Profile:
+    """
+    Profile the struct logs of a call of `receiver` with `calldata`.
+    """
+    profile = Profile()
+    if not frames:
+        return profile
+
+    op_gas = _op_gas(frames)
+    warm = set()
+
+    contexts = [_context((), receiver, receiver, calldata)]
+    contexts[0].depth = frames[0].depth
+    pending = None
+
+    for i, frame in enumerate(frames):
+        if pending is not None and frame.depth > contexts[-1].depth:
+            pending.depth = frame.depth
+            contexts.append(pending)
+        while len(contexts) > 1 and frame.depth < contexts[-1].depth:
+            callee = contexts.pop()
+            # the call opcode was charged for its callee too
+            caller = contexts[-1]
+            profile.stacks[callee.call_key] -= callee.gas
+            profile.functions[caller.stack[-1]].gas -= callee.gas
+        pending = None
+
+        context = contexts[-1]
+        function = context.stack[-1]
+        stats = profile.functions.setdefault(function, FunctionStats())
+        item = context.pcmap.get(frame.pc)
+        line = getattr(item, "line_start", None)
+        source = context.code.source_id if context.code else None
+        key = context.stack + ((f"{source}:{line}",) if line and source else ())
+
+        gas = op_gas[i]
+        context.gas += gas
+        stats.gas += gas
+        profile.stacks[key] = profile.stacks.get(key, 0) + gas
+
+        op = frame.op
+        raw = frame.raw
+        if op in {"SLOAD", "SSTORE"}:
+            slot = (context.storage, _int(raw["stack"][-1]))
+            if op == "SLOAD":
+                stats.sloads += 1
+            else:
+                stats.sstores += 1
+            if slot in warm:
+                stats.warm += 1
+            else:
+                stats.cold += 1
+                warm.add(slot)
+        elif op in CALL_OPS:
+            stats.calls += 1
+            target = _address(raw["stack"][-2])
+            storage = context.storage if op in CODE_ONLY_CALL_OPS else target
+            pending = _context(context.stack, storage, target, _calldata(op, raw), key)
+        elif op in CREATE_OPS:
+            stats.calls += 1
+            created = frame.contract_address
+            pending = _context(context.stack, created, created, None, key)
+
+    return profile
+
+
+def profile_transaction(receipt) -> Profile:
+    """
+    Profile a transaction. The provider must support `debug_traceTransaction`.
+    Intrinsic gas and refunds are not in the trace, so the profile accounts for
+    less gas than the receipt.
+    """
+    if receipt.receiver is None:
+        return profile_trace(list(receipt.trace), receipt.contract_address, None)
+    return profile_trace(
+        list(receipt.trace), receipt.receiver, bytes(receipt.transaction.data)
+    )
+
+
+def write_folded(profile: Profile, path) -> None:
+    """
+    Write the gas of each stack in the folded format of flamegraph.pl and
+    speedscope: `Contract.function;Contract.function;source:line gas`.
+    """
+    lines = [
+        f"{';'.join(stack)} {gas}"
+        for stack, gas in sorted(profile.stacks.items())
+        if gas > 0
+    ]
+    Path(path).write_text("\n".join(lines) + "\n")
+
+
+def format_functions(profile: Profile) -> str:
+    """
+    Table of the function stats, most expensive first.
+    """
+    rows = [
+        f"{'gas':>10} {'sload':>6} {'sstore':>6} {'cold':>6} {'warm':>6} {'calls':>6}"
+        " function"
+    ]
+    for function, stats in sorted(
+        profile.functions.items(), key=lambda item: item[1].gas, reverse=True
+    ):
+        rows.append(
+            f"{stats.gas:>10} {stats.sloads:>6} {stats.sstores:>6} {stats.cold:>6} "
+            f"{stats.warm:>6} {stats.calls:>6} {function}"
+        )
+    return "\n".join(rows)
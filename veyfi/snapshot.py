@@ -0,0 +1,122 @@
+"""
+Voting power of every veYFI holder at a block height.
+
+User points and slope changes are rebuilt with the reference model from the lock
+events stored by `veyfi.indexer`, which must have indexed VotingYFI from its
+deployment. The timestamp of the block is interpolated between the global points
+of VotingYFI exactly like `getPriorVotes`, which only takes a handful of calls.
+"""
+import bisect
+import csv
+import json
+from typing import Dict, List, Tuple
+
+from ape import chain
+
+from veyfi.indexer import Indexer
+from veyfi.model import LockedBalance, VotingYFIModel
+
+
+def build_model(
+    indexer: Indexer, ve_yfi, deployed_at: int
+) -> Tuple[VotingYFIModel, Dict[str, List[int]]]:
+    """
+    Replay the indexed lock events of `ve_yfi` in the model.
+
+    :return: the model and, for every user, the block of each epoch.
+    """
+    model = VotingYFIModel(deployed_at)
+    epoch_blocks: Dict[str, List[int]] = {}
+    rows = indexer.db.execute(
+        "SELECT block_number, event, args FROM logs "
+        "WHERE contract = ? AND event IN ('ModifyLock', 'Withdraw') "
+        "ORDER BY block_number, log_index",
+        (str(ve_yfi),),
+    )
+    for block_number, event, args in rows:
+        args = json.loads(args)
+        user = args["user"]
+        if event == "ModifyLock":
+            old_lock = model.locked.get(user, LockedBalance())
+            model.modify_lock(
+                user,
+                args["amount"] - old_lock.amount,
+                args["locktime"] if args["locktime"] != old_lock.end else 0,
+                args["ts"],
+                sender=args["sender"],
+            )
+        else:
+            model.withdraw(user, args["ts"])
+        # epoch 0 is the empty point
+        epoch_blocks.setdefault(user, [0]).append(block_number)
+    return model, epoch_blocks
+
+
+def block_time(ve_yfi, height: int) -> int:
+    """
+    Timestamp of block `height` interpolated between the global points of
+    `ve_yfi`, as in `VotingYFI.getPriorVotes`.
+    """
+    max_epoch = ve_yfi.epoch(ve_yfi)
+    low, high = 0, max_epoch
+    while low < high:
+        mid = (low + high + 1) // 2
+        if ve_yfi.point_history(ve_yfi, mid).blk <= height:
+            low = mid
+        else:
+            high = mid - 1
+
+    point_0 = ve_yfi.point_history(ve_yfi, low)
+    if low < max_epoch:
+        point_1 = ve_yfi.point_history(ve_yfi, low + 1)
+        d_block = point_1.blk - point_0.blk
+        d_t = point_1.ts - point_0.ts
+    else:
+        head = chain.blocks.head
+        d_block = head.number - point_0.blk
+        d_t = head.timestamp - point_0.ts
+    if d_block == 0:
+        return point_0.ts
+    return point_0.ts + d_t * (height - point_0.blk) // d_block
+
+
+def snapshot(indexer: Indexer, ve_yfi, height: int) -> Dict[str, int]:
+    """
+    Voting power of every user with an indexed lock at block `height`,
+    the same as `ve_yfi.getPriorVotes(user, height)`.
+    """
+    if height > chain.blocks.height:
+        raise ValueError("block height in the future")
+    model, epoch_blocks = build_model(
+        indexer, ve_yfi, ve_yfi.point_history(ve_yfi, 0).ts
+    )
+    users = sorted(epoch_blocks)
+    epochs = [bisect.bisect_right(epoch_blocks[user], height) - 1 for user in users]
+    ts = block_time(ve_yfi, height)
+    balances = model.balances_at_epochs(users, epochs, [ts] * len(users))
+    return dict(zip(users, (int(balance) for balance in balances)))
+
+
+def write_snapshot(path: str, balances: Dict[str, int]):
+    """
+    Write `balances` to a CSV file, or to Parquet if `path` ends with `.parquet`.
+    """
+    if path.endswith(".parquet"):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise RuntimeError("Parquet output requires pandas and pyarrow")
+
+        # amounts do not fit in 64 bits
+        pd.DataFrame(
+            {
+                "user": list(balances),
+                "voting_power": [str(balance) for balance in balances.values()],
+            }
+        ).to_parquet(path, index=False)
+        return
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["user", "voting_power"])
+        writer.writerows(balances.items())